@@ -0,0 +1,65 @@
+"""Shared fixtures for benchmarks.
+
+Run with `make benchmark`. Large inputs (CSVs of 100 MB and up, big notebook batches) are skipped
+unless SUMMARYNB_BENCHMARK_LARGE=1 is set.
+"""
+import os
+import tracemalloc
+import pytest
+
+run_large = os.environ.get("SUMMARYNB_BENCHMARK_LARGE", "0") != "0"
+
+csv_sizes = {
+    "1KB": 1024,
+    "1MB": 1024**2,
+    "100MB": 100 * 1024**2,
+    "1GB": 1024**3,
+}
+large_csv_sizes = {"100MB", "1GB"}
+
+
+def skip_unless_large(is_large):
+    if is_large and not run_large:
+        pytest.skip("large benchmark: set SUMMARYNB_BENCHMARK_LARGE=1 to run")
+
+
+def record_peak_memory(benchmark, func, *args, **kwargs):
+    """Run func once under tracemalloc and store its peak Python heap allocation alongside the timings.
+    Done separately from the timed rounds, because tracing slows allocation down."""
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["peak_memory_bytes"] = peak
+
+
+@pytest.fixture(scope="session")
+def csv_file(tmp_path_factory):
+    """Factory for synthetic CSV files of about the requested size. Files are shared across benchmarks."""
+    cache = {}
+
+    def make(size_name):
+        skip_unless_large(size_name in large_csv_sizes)
+        if size_name not in cache:
+            fname = tmp_path_factory.mktemp("csv") / f"{size_name}.csv"
+            target_size = csv_sizes[size_name]
+            row_template = "{0},{0}.5,sample_{0},{1}\n"
+            with open(fname, "w") as w:
+                w.write("id,value,label,flag\n")
+                size = 0
+                row = 0
+                # write in blocks to keep generation of the largest files fast
+                while size < target_size:
+                    block = "".join(
+                        row_template.format(i, i % 2 == 0)
+                        for i in range(row, row + 10000)
+                    )
+                    w.write(block)
+                    size += len(block)
+                    row += 10000
+            cache[size_name] = str(fname)
+        return cache[size_name]
+
+    return make
@@ -0,0 +1,77 @@
+"""Benchmarks of `summarynb run` on batches of trivial notebooks, to measure per-notebook execution overhead."""
+import pytest
+from click.testing import CliRunner
+from summarynb import cli
+from summarynb.config import edit_config
+from .conftest import skip_unless_large
+
+nbformat = pytest.importorskip("nbformat")
+pytest.importorskip("nbclient")
+pytest.importorskip("ipykernel")
+
+
+@pytest.fixture
+def notebooks(tmp_path, monkeypatch):
+    def make(n_notebooks):
+        fnames = []
+        for i in range(n_notebooks):
+            fname = str(tmp_path / f"notebook_{i}.ipynb")
+            nb = nbformat.v4.new_notebook(
+                cells=[nbformat.v4.new_code_cell(f"x = {i}\nx * 2")]
+            )
+            nbformat.write(nb, fname)
+            fnames.append(fname)
+        config_fname = str(tmp_path / ".summarynb.config")
+        with edit_config(config_fname) as config:
+            for fname in fnames:
+                config.add(fname)
+        monkeypatch.setattr(cli, "path_to_config_file", lambda: config_fname)
+        monkeypatch.setattr(
+            cli, "path_to_run_cache", lambda: str(tmp_path / ".summarynb.cache")
+        )
+        monkeypatch.setattr(
+            cli, "path_to_deps_file", lambda: str(tmp_path / ".summarynb.deps")
+        )
+        monkeypatch.setattr(
+            cli, "path_to_history_file", lambda: str(tmp_path / ".summarynb.history")
+        )
+        return fnames
+
+    return make
+
+
+@pytest.mark.parametrize("engine", ["kernel", "nbconvert"])
+@pytest.mark.parametrize("n_notebooks", [1, 4, 16])
+def test_run(benchmark, notebooks, n_notebooks, engine):
+    skip_unless_large(n_notebooks > 4)
+    notebooks(n_notebooks)
+    runner = CliRunner()
+
+    def run():
+        result = runner.invoke(
+            cli.main, ["run", "--force", "--jobs", "4", "--engine", engine]
+        )
+        assert result.exit_code == 0, result.output
+
+    benchmark.pedantic(run, rounds=3)
+
+
+def test_run_all_unchanged(benchmark, notebooks):
+    """Checking a batch of notebooks that are up to date should cost next to nothing."""
+    notebooks(16)
+    runner = CliRunner()
+    assert runner.invoke(cli.main, ["run", "--jobs", "4"]).exit_code == 0
+    benchmark(runner.invoke, cli.main, ["run"])
+
+
+@pytest.mark.parametrize("n_notebooks", [10, 1000])
+def test_list(benchmark, tmp_path, monkeypatch, n_notebooks):
+    config_fname = str(tmp_path / ".summarynb.config")
+    with edit_config(config_fname) as config:
+        for i in range(n_notebooks):
+            config.add(f"notebook_{i}.ipynb", timeout=600, priority=i % 3)
+    monkeypatch.setattr(cli, "path_to_config_file", lambda: config_fname)
+    runner = CliRunner()
+    result = benchmark(runner.invoke, cli.main, ["list"])
+    assert result.exit_code == 0
+    assert len(result.output.splitlines()) == n_notebooks + 1
@@ -0,0 +1,219 @@
+"""Benchmarks of grid layout and HTML rendering: chunks(), _flatten(), _make_HTML(), _assemble_HTML(), csv()."""
+import pytest
+import summarynb
+from .conftest import csv_sizes, record_peak_memory
+
+grid_sizes = [10, 100, 1000, 10000]
+
+
+def cell_template(max_width, max_height, *args, **kwargs):
+    return '<div style="min-width: 100px;">cell</div>'
+
+
+@pytest.mark.parametrize("n_cells", grid_sizes)
+def test_flatten(benchmark, n_cells):
+    nested = [[f"file_{i}.png", [f"file_{i}.csv"]] for i in range(n_cells // 2)]
+    record_peak_memory(benchmark, summarynb._flatten, nested)
+    benchmark(summarynb._flatten, nested)
+
+
+@pytest.mark.parametrize("n_cells", grid_sizes)
+def test_chunks(benchmark, n_cells):
+    entries = [f"file_{i}.png" for i in range(n_cells)]
+    record_peak_memory(benchmark, summarynb.chunks, entries, 4)
+    benchmark(summarynb.chunks, entries, 4)
+
+
+@pytest.mark.parametrize("source", ["list", "array", "generator"])
+@pytest.mark.parametrize("n_cells", [10000, 100000])
+def test_chunks_sources(benchmark, n_cells, source):
+    """Rows from a list, a NumPy array, or a generator of file names, consumed one row at a time.
+    Generators are chunked lazily, so peak memory stays flat however many files there are.
+    """
+    import numpy as np
+
+    names = [f"file_{i}.png" for i in range(n_cells)]
+    make_entries = {
+        "list": lambda: names,
+        "array": lambda: np.array(names, dtype=object),
+        "generator": lambda: (f"file_{i}.png" for i in range(n_cells)),
+    }[source]
+
+    def consume():
+        for row in summarynb.chunks(make_entries(), 4):
+            pass
+
+    record_peak_memory(benchmark, consume)
+    benchmark(consume)
+
+
+@pytest.mark.parametrize("n_cells", grid_sizes)
+def test_make_html_templates(benchmark, n_cells):
+    """Layout overhead alone: cells are trivial template functions."""
+    entries = summarynb.chunks([cell_template] * n_cells, 4)
+    kwargs = dict(headers=["a", "b", "c", "d"], max_width=400, max_height=400)
+    record_peak_memory(benchmark, summarynb._make_HTML, entries, **kwargs)
+    benchmark(summarynb._make_HTML, entries, **kwargs)
+
+
+def legacy_assemble(cells, headers):
+    """Table assembly as _make_HTML() did it before the single-pass writer: per-cell format() calls and a join per row."""
+
+    def wrap_in_column(contents):
+        return """<td style="text-align: center">{contents}</td>""".format(
+            contents=contents
+        )
+
+    def wrap_in_row(contents):
+        return """<tr>{contents}</tr>""".format(contents=contents)
+
+    def make_headers(headers):
+        if headers is not None:
+            return """<tr>{contents}</tr>""".format(
+                contents="\n".join(
+                    [
+                        """<th style="text-align: center">%s</th>"""
+                        % str(header).strip()
+                        for header in headers
+                    ]
+                )
+            )
+        return ""
+
+    rows = ["\n".join([wrap_in_column(cell) for cell in row]) for row in cells]
+    return """<table>{contents}</table>""".format(
+        contents=make_headers(headers) + "\n".join([wrap_in_row(row) for row in rows])
+    )
+
+
+@pytest.mark.parametrize("implementation", ["legacy", "streaming"])
+@pytest.mark.parametrize("n_cells", grid_sizes + [100000])
+def test_assemble_html(benchmark, n_cells, implementation):
+    """Assembly of already rendered cells into a table, against the implementation it replaced."""
+    cells = summarynb.chunks(
+        ['<div style="min-width: 100px;">cell %d</div>' % i for i in range(n_cells)], 4
+    )
+    headers = ["a", "b", "c", "d"]
+    assemble = (
+        legacy_assemble if implementation == "legacy" else summarynb._assemble_HTML
+    )
+    assert assemble(cells, headers) == legacy_assemble(cells, headers)
+    record_peak_memory(benchmark, assemble, cells, headers)
+    benchmark(assemble, cells, headers)
+
+
+@pytest.mark.parametrize("n_cells", grid_sizes)
+def test_make_html_images(benchmark, n_cells):
+    """Images given by filename, which resolve through _get_template()."""
+    entries = summarynb.chunks(["tests/data/run_1.png"] * n_cells, 4)
+    kwargs = dict(headers=None, max_width=400, max_height=400)
+    record_peak_memory(benchmark, summarynb._make_HTML, entries, **kwargs)
+    benchmark(summarynb._make_HTML, entries, **kwargs)
+
+
+@pytest.mark.parametrize("workers", [None, 8])
+def test_make_html_files(benchmark, workers):
+    """A realistic grid of images, tables and text files, uncached."""
+    entries = summarynb.chunks(
+        [
+            [
+                f"tests/data/run_{i}.png",
+                f"tests/data/run_{i}.csv",
+                "tests/data/test.txt",
+            ]
+            for i in range(1, 17)
+        ],
+        3,
+    )
+    kwargs = dict(headers=None, max_width=400, max_height=400, workers=workers)
+    record_peak_memory(benchmark, summarynb._make_HTML, entries, **kwargs)
+    benchmark.pedantic(
+        summarynb._make_HTML,
+        args=(entries,),
+        kwargs=kwargs,
+        setup=summarynb.cache_clear,
+        rounds=20,
+    )
+
+
+@pytest.mark.parametrize("size_name", list(csv_sizes))
+def test_csv_full(benchmark, csv_file, size_name):
+    fname = csv_file(size_name)
+    if size_name == "1GB":
+        pytest.skip("rendering a 1 GB table in full is not a supported use")
+
+    def render():
+        summarynb.cache_clear()
+        return summarynb.csv(fname)()
+
+    record_peak_memory(benchmark, render)
+    benchmark.pedantic(render, rounds=3 if size_name == "100MB" else 10)
+
+
+@pytest.mark.parametrize("rows", ["head", "tail", "sample"])
+@pytest.mark.parametrize("size_name", list(csv_sizes))
+def test_csv_excerpt(benchmark, csv_file, size_name, rows):
+    fname = csv_file(size_name)
+
+    def render():
+        summarynb.cache_clear()
+        return summarynb.csv(fname, max_rows=20, rows=rows)()
+
+    record_peak_memory(benchmark, render)
+    benchmark.pedantic(render, rounds=5)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [dict(lines="head"), dict(lines="tail"), dict(lines="both"), dict(grep="_99999,")],
+    ids=["head", "tail", "both", "grep"],
+)
+@pytest.mark.parametrize("size_name", list(csv_sizes))
+def test_textfile_excerpt(benchmark, csv_file, size_name, options):
+    fname = csv_file(size_name)
+
+    def render():
+        summarynb.cache_clear()
+        return summarynb.textfile(fname, **options)()
+
+    record_peak_memory(benchmark, render)
+    benchmark.pedantic(render, rounds=5)
+
+
+@pytest.fixture(scope="module")
+def wide_table_files(tmp_path_factory):
+    """A table of 500,000 rows by 100 columns, written as Parquet and as (compressed) Feather."""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.feather
+    import pyarrow.parquet
+
+    n_rows = 500_000
+    table = pa.table({f"col_{i}": pa.array(range(i, i + n_rows)) for i in range(100)})
+    directory = tmp_path_factory.mktemp("columnar")
+    pa.parquet.write_table(table, directory / "wide.parquet", row_group_size=50_000)
+    pa.feather.write_feather(table, directory / "wide.feather", chunksize=50_000)
+    return {
+        "parquet": str(directory / "wide.parquet"),
+        "feather": str(directory / "wide.feather"),
+    }
+
+
+@pytest.mark.parametrize("rows", ["head", "tail"])
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_columnar_preview(benchmark, wide_table_files, file_format, rows):
+    """Five columns of the first or last 20 rows of a wide table."""
+    read = summarynb.parquet if file_format == "parquet" else summarynb.feather
+    cols = [f"col_{i}" for i in range(0, 100, 20)]
+
+    def render():
+        summarynb.cache_clear()
+        return read(wide_table_files[file_format], cols=cols, max_rows=20, rows=rows)()
+
+    record_peak_memory(benchmark, render)
+    benchmark.pedantic(render, rounds=10)
+
+
+def test_csv_cached(benchmark, csv_file):
+    fname = csv_file("1MB")
+    summarynb.csv(fname)()
+    benchmark(lambda: summarynb.csv(fname)())
@@ -1,6 +1,17 @@
+import functools
+import io
+import itertools
+import math
 import os
-import pandas as pd
-from IPython.display import HTML, display
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .cache import CacheInfo, render_cache
+from .deps import record_access
+from .profiling import Profiler, active_profiler, profile
+from .renderers import Renderer, RendererRegistry
+from .storage import atomic_write
 
 """Top-level package for Summary Notebooks."""
 
@@ -13,45 +24,241 @@ __version__ = "0.1.4"
 # TODO: make max_width a property of <td>, not <img>?
 
 
-def image(img_src):
+# Thumbnails are written relative to the notebook's working directory, so the browser can load them by relative path.
+THUMBNAIL_CACHE_DIR = ".summarynb_thumbnails"
+
+
+def _make_thumbnail(img_src, max_width, max_height):
+    """Downscale an image to fit within max_width x max_height pixels, caching the result on disk.
+
+    Thumbnails are keyed by the source image's path, modification time and size, and the requested dimensions,
+    so they are regenerated when the source changes. Returns the thumbnail's path,
+    or the original path if the image is already small enough or can't be read by Pillow (e.g. SVG).
+    """
+    import hashlib
+
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("Thumbnails require Pillow: pip install Pillow")
+
+    if not max_width and not max_height:
+        return img_src
+
+    stat = os.stat(img_src)
+    key = hashlib.sha1(
+        "|".join(
+            str(part)
+            for part in [
+                os.path.abspath(img_src),
+                stat.st_mtime_ns,
+                stat.st_size,
+                max_width,
+                max_height,
+            ]
+        ).encode("utf-8")
+    ).hexdigest()
+    extension = os.path.splitext(img_src)[1].lower()
+    if extension not in [".jpg", ".jpeg"]:
+        # write everything else as PNG to preserve transparency
+        extension = ".png"
+    thumbnail_src = os.path.join(THUMBNAIL_CACHE_DIR, key + extension)
+    if os.path.exists(thumbnail_src):
+        return thumbnail_src
+
+    try:
+        img = Image.open(img_src)
+    except OSError:
+        # not a raster image Pillow understands
+        return img_src
+    with img:
+        # an unset dimension is unconstrained
+        bounds = (max_width or img.width, max_height or img.height)
+        if img.width <= bounds[0] and img.height <= bounds[1]:
+            return img_src
+        img.thumbnail(bounds)
+        os.makedirs(THUMBNAIL_CACHE_DIR, exist_ok=True)
+        # threads or processes may make the same thumbnail at once, and readers never see a partial one
+        with atomic_write(thumbnail_src, "wb") as w:
+            img.save(w, format="JPEG" if extension != ".png" else "PNG")
+    return thumbnail_src
+
+
+def _encode_image(img_src, embed, quality):
+    """Return the MIME type and bytes of an image to embed.
+    If [embed] is a format name ("webp", "jpeg", or "png"), the image is recompressed to that format with Pillow.
+    """
+    import mimetypes
+
+    if embed is True:
+        with open(img_src, "rb") as f:
+            return mimetypes.guess_type(img_src)[0] or "image/png", f.read()
+
+    image_format = "jpeg" if embed.lower() == "jpg" else embed.lower()
+    if image_format not in ["webp", "jpeg", "png"]:
+        raise ValueError(f"embed must be True, 'webp', 'jpeg', or 'png', not {embed!r}")
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("Recompressing images requires Pillow: pip install Pillow")
+    buffer = io.BytesIO()
+    with Image.open(img_src) as img:
+        if image_format == "jpeg" and img.mode not in ["RGB", "L"]:
+            # JPEG has no alpha channel
+            img = img.convert("RGB")
+        img.save(buffer, format=image_format.upper(), quality=quality, optimize=True)
+    return f"image/{image_format}", buffer.getvalue()
+
+
+class _EmbeddedImages:
+    """Digests of the images embedded so far in one output, e.g. one show() call, shared by its rendering threads.
+    Scoped to a single output, so re-running a cell never leaves references to a copy that was replaced.
+    """
+
+    def __init__(self):
+        self._digests = set()
+        self._lock = threading.Lock()
+        # whether any image was deduplicated, so the output needs _resolve_embedded_refs_script
+        self.referenced = False
+
+    def add(self, digest):
+        """Record [digest], returning whether it was embedded earlier in this output."""
+        with self._lock:
+            already_embedded = digest in self._digests
+            self._digests.add(digest)
+            self.referenced = self.referenced or already_embedded
+        return already_embedded
+
+    def finish(self, html):
+        """Append the script resolving deduplicated images to the output's [html], once, if it needs it."""
+        if self.referenced:
+            return html + _resolve_embedded_refs_script
+        return html
+
+
+# Points each <img data-summarynb-ref="digest"> at the copy of that image embedded elsewhere in the same output.
+# Copies and references may be on pages of a paginated grid that are held in <template> elements, so search those too.
+_resolve_embedded_refs_script = """<script>
+(function () {
+  var roots = [document];
+  document.querySelectorAll("template").forEach(function (template) { roots.push(template.content); });
+  function source(digest) {
+    for (var i = 0; i < roots.length; i++) {
+      var img = roots[i].querySelector("img.summarynb-embed-" + digest);
+      if (img) return img;
+    }
+    return null;
+  }
+  roots.forEach(function (root) {
+    root.querySelectorAll("img[data-summarynb-ref]").forEach(function (img) {
+      var copy = source(img.dataset.summarynbRef);
+      if (copy) { img.src = copy.src; img.removeAttribute("data-summarynb-ref"); }
+    });
+  });
+})();
+</script>"""
+
+
+def image(img_src, thumbnail=False, embed=False, quality=85, dedupe=False):
     """Renders an image.
 
     :param img_src: Image filename.
     :type img_src: str
+    :param thumbnail: Show a downscaled copy of the image, sized to the max width and height, that links to the full-resolution original. The copy is lazy-loaded by the browser and cached on disk in THUMBNAIL_CACHE_DIR. Requires Pillow. Defaults to False.
+    :type thumbnail: bool, optional
+    :param embed: Embed the image in the notebook as a data URI, so the notebook is self-contained. Set to "webp", "jpeg", or "png" to recompress the image to that format first (requires Pillow). Defaults to False (link to the file).
+    :type embed: bool or str, optional
+    :param quality: WebP or JPEG quality (1-100) when recompressing an embedded image. Defaults to 85.
+    :type quality: int, optional
+    :param dedupe: When embedding an image that was already embedded earlier in the same show() output, reference the earlier copy instead of repeating its bytes. The reference is resolved by a script, so it only displays where the notebook's JavaScript runs (i.e. trusted notebooks, not GitHub or nbviewer). Defaults to False.
+    :type dedupe: bool, optional
     :return: Template function that accepts a max pixel width integer and returns HTML.
     :rtype: function
     """
 
+    record_access(img_src)
     # Convert absolute path to relative path, since a browser won't be able to grab an image from "/home/..."
     img_src = os.path.relpath(img_src)
 
-    def template(max_width, max_height, *args, **kwargs):
+    def template(max_width, max_height, *args, embedded_images=None, **kwargs):
         def convert_to_px_or_unset(optional_numeric_value):
             if not optional_numeric_value:
                 return "inherit"
             return str(optional_numeric_value) + "px"
 
+        def link_to_original(html):
+            if thumbnail:
+                return """<a href="{img_src}" target="_blank">{html}</a>""".format(
+                    img_src=img_src, html=html
+                )
+            return html
+
+        src = img_src
+        attributes = ""
+        if thumbnail:
+            src = _make_thumbnail(img_src, max_width, max_height)
+            attributes += ' loading="lazy"'
+
         max_width = convert_to_px_or_unset(max_width)
         max_height = convert_to_px_or_unset(max_height)
 
-        return """<img src="{img_src}" style="max-width: {max_width}; max-height: {max_height};" />""".format(
-            img_src=img_src, max_width=max_width, max_height=max_height
+        if embed:
+            import base64
+            import hashlib
+
+            mime_type, data = _encode_image(src, embed, quality)
+            digest = hashlib.sha256(data).hexdigest()[:16]
+            # deduplicated only within one output, which passes [embedded_images] in
+            if dedupe and embedded_images is not None and embedded_images.add(digest):
+                # point at the copy embedded earlier, instead of repeating its bytes
+                return link_to_original(
+                    """<img data-summarynb-ref="{digest}" alt="{img_src}"{attributes} style="max-width: {max_width}; max-height: {max_height};" />""".format(
+                        digest=digest,
+                        img_src=img_src,
+                        attributes=attributes,
+                        max_width=max_width,
+                        max_height=max_height,
+                    )
+                )
+            src = "data:{};base64,{}".format(
+                mime_type, base64.b64encode(data).decode("ascii")
+            )
+            attributes = f' class="summarynb-embed-{digest}"' + attributes
+
+        return link_to_original(
+            """<img src="{src}"{attributes} style="max-width: {max_width}; max-height: {max_height};" />""".format(
+                src=src,
+                attributes=attributes,
+                max_width=max_width,
+                max_height=max_height,
+            )
         )
 
+    # tells _call_template() to pass in the images embedded so far in the output
+    template.embeds_images = True
     return template
 
 
-def table(df):
+def table(df, max_rows=None, max_cols=None, total_rows=None):
     """Renders a Pandas dataframe.
 
     :param df: the dataframe
     :type df: pandas.DataFrame
+    :param max_rows: show at most this many rows (first and last few, as pandas does), defaults to None (show all)
+    :type max_rows: int, optional
+    :param max_cols: show at most this many columns (first and last few, as pandas does), defaults to None (show all)
+    :type max_cols: int, optional
+    :param total_rows: number of rows in the full table, if [df] is an excerpt. Reported below the table. Defaults to None
+    :type total_rows: int, optional
     :return: Template function that returns HTML.
     :rtype: function
     """
 
     def template(*args, **kwargs):
-        return df.to_html()
+        html = df.to_html(max_rows=max_rows, max_cols=max_cols)
+        if total_rows is not None and total_rows > df.shape[0]:
+            html += f"<p>Showing {df.shape[0]} of {total_rows} rows.</p>"
+        return html
 
     return template
 
@@ -62,10 +269,11 @@ def plaintext(text, **kwargs):
     :param text: text to display
     :type text: str
     """
+    import html
 
     def template(*args, **kwargs):
         # convert to html
-        return f"<pre>{text}</pre>"
+        return f"<pre>{html.escape(text, quote=False)}</pre>"
 
     return template
 
@@ -87,14 +295,229 @@ def empty(width=None):
 """Extensions that simplify usage of the above base functions."""
 
 
-def csv(fname, cols=None, **kwargs):
+_compressed_extensions = [".gz", ".bz2", ".zip", ".xz", ".zst", ".tar"]
+
+
+def _count_lines(fname, chunk_size=1 << 20):
+    """Count lines in a file by scanning it in binary chunks, without decoding or parsing."""
+    n_lines = 0
+    last_chunk = b""
+    with open(fname, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            n_lines += chunk.count(b"\n")
+            last_chunk = chunk
+    if last_chunk and not last_chunk.endswith(b"\n"):
+        # unterminated last line
+        n_lines += 1
+    return n_lines
+
+
+def _tail_lines(fname, n_lines, chunk_size=1 << 16):
+    """Return the last [n_lines] lines of a file, reading backwards from the end."""
+    with open(fname, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b""
+        # n_lines complete lines need n_lines + 1 newlines, counting a trailing newline
+        while position > 0 and data.count(b"\n") <= n_lines:
+            read_size = min(chunk_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+    if data.endswith(b"\n"):
+        data = data[:-1]
+    return [line + b"\n" for line in data.split(b"\n")[-n_lines:]]
+
+
+def _line_end(buffer, position):
+    """Offset just past the end of the line containing [position], including its line break."""
+    end = buffer.find(b"\n", position)
+    return len(buffer) if end == -1 else end + 1
+
+
+def _head_window(buffer, start, max_bytes, max_lines):
+    """End of the longest run of whole lines from [start] that fits in [max_bytes] and [max_lines].
+    A first line longer than [max_bytes] is cut."""
+    limit = min(len(buffer), start + max_bytes)
+    end = start
+    n_lines = 0
+    while end < limit and (max_lines is None or n_lines < max_lines):
+        next_end = _line_end(buffer, end)
+        if next_end > limit:
+            if end == start:
+                end = limit
+            break
+        end = next_end
+        n_lines += 1
+    return end
+
+
+def _tail_window(buffer, end, max_bytes, max_lines):
+    """Start of the longest run of whole lines ending at [end] that fits in [max_bytes] and [max_lines].
+    A last line longer than [max_bytes] is cut."""
+    limit = max(0, end - max_bytes)
+    start = end
+    n_lines = 0
+    while start > limit and (max_lines is None or n_lines < max_lines):
+        previous_start = buffer.rfind(b"\n", 0, start - 1) + 1
+        if previous_start < limit:
+            if start == end:
+                start = limit
+            break
+        start = previous_start
+        n_lines += 1
+    return start
+
+
+def _grep_windows(buffer, pattern, context, max_bytes, max_lines):
+    """Byte ranges of the lines matching regex [pattern], with [context] lines around each.
+    Stops once the ranges would exceed [max_bytes] or [max_lines]."""
+    import re
+
+    if isinstance(pattern, str):
+        pattern = pattern.encode("utf-8")
+    # ^ and $ match at line breaks, as in grep
+    regex = re.compile(pattern, re.MULTILINE)
+    windows = []
+    n_bytes = n_lines = 0
+    position = 0
+    while position < len(buffer):
+        match = regex.search(buffer, position)
+        if match is None:
+            break
+        start = buffer.rfind(b"\n", 0, match.start()) + 1
+        for _ in range(context):
+            if start == 0:
+                break
+            start = buffer.rfind(b"\n", 0, start - 1) + 1
+        end = _line_end(buffer, max(match.end() - 1, match.start()))
+        for _ in range(context):
+            if end == len(buffer):
+                break
+            end = _line_end(buffer, end)
+        if windows:
+            # context lines may overlap the previous window
+            start = max(start, windows[-1][1])
+        window_bytes = end - start
+        if n_bytes + window_bytes > max_bytes:
+            break
+        if max_lines is not None:
+            window_lines = buffer[start:end].count(b"\n")
+            if n_lines + window_lines > max_lines:
+                break
+            n_lines += window_lines
+        windows.append((start, end))
+        n_bytes += window_bytes
+        position = end
+    return windows
+
+
+def _sample_lines(fname, n_lines, start, seed=0):
+    """Return about [n_lines] lines from random positions after byte offset [start], in file order.
+
+    Seeks to random byte offsets and takes the next full line, so only the sampled lines are read.
+    Lines that follow long lines are slightly favored, and collisions can return fewer than [n_lines] lines.
+    A fixed seed keeps the sample (and therefore the rendered notebook) stable between runs.
+    """
+    rng = random.Random(seed)
+    size = os.path.getsize(fname)
+    lines = {}
+    with open(fname, "rb") as f:
+        for offset in sorted(rng.randrange(start, size) for _ in range(n_lines)):
+            if offset > start:
+                # skip to the start of the line after offset - 1
+                f.seek(offset - 1)
+                f.readline()
+            else:
+                # [start] is itself a line start, e.g. of the first line of a file without a header
+                f.seek(start)
+            line_start = f.tell()
+            if line_start in lines:
+                continue
+            line = f.readline()
+            if line:
+                lines[line_start] = line if line.endswith(b"\n") else line + b"\n"
+    return [lines[line_start] for line_start in sorted(lines)]
+
+
+def _read_csv_excerpt(fname, max_rows, rows="head", **kwargs):
+    """Read at most [max_rows] rows of a csv, without parsing the rest of the file.
+    Returns the dataframe and the total number of rows in the file (None if unknown)."""
+    if rows not in ["head", "tail", "sample"]:
+        raise ValueError(f"rows must be 'head', 'tail', or 'sample', not {rows!r}")
+    compressed = os.path.splitext(fname)[1].lower() in _compressed_extensions or (
+        kwargs.get("compression", "infer") not in ["infer", None]
+    )
+    # as in pandas, passing names means the file has no header line, unless header is set explicitly
+    header = kwargs.get("header", None if kwargs.get("names") is not None else "infer")
+    n_header_lines = 0 if header is None else 1
+    import pandas as pd
+
+    if rows == "head":
+        df = pd.read_csv(fname, nrows=max_rows, **kwargs)
+        if compressed:
+            return df, None
+        return df, _count_lines(fname) - n_header_lines
+
+    if compressed:
+        raise ValueError(f"rows={rows!r} requires an uncompressed file")
+    total_rows = _count_lines(fname) - n_header_lines
+    if total_rows <= max_rows:
+        return pd.read_csv(fname, **kwargs), total_rows
+
+    with open(fname, "rb") as f:
+        header = f.readline() if n_header_lines else b""
+    if rows == "tail":
+        lines = _tail_lines(fname, max_rows)
+    else:
+        lines = _sample_lines(fname, max_rows, start=len(header))
+    df = pd.read_csv(io.BytesIO(header + b"".join(lines)), **kwargs)
+    if rows == "tail" and "index_col" not in kwargs:
+        # number rows by their position in the full file
+        df.index = pd.RangeIndex(total_rows - df.shape[0], total_rows)
+    return df, total_rows
+
+
+def csv(fname, cols=None, max_rows=None, max_cols=None, rows="head", **kwargs):
     """
     Read a csv from [fname]. Optionally subset to columns [cols]. Kwargs passed onto pandas read_csv.
+
+    Set [max_rows] to read only part of a large file, chosen by [rows]:
+        - "head": the first max_rows rows.
+        - "tail": the last max_rows rows, found by reading backwards from the end of the file.
+        - "sample": about max_rows rows from random (but reproducible) positions in the file.
+    The total number of rows is counted by a fast scan for line breaks and reported below the table.
+    (Quoted values containing line breaks make that count approximate.)
+    Tail and sample modes require an uncompressed file with at most one header line.
+
+    [max_cols] limits the number of columns displayed.
+
+    Rendered HTML is cached until the file changes: see cache_info().
     """
-    df = pd.read_csv(fname, **kwargs)
-    if cols is not None:
-        df = df[cols]
-    return table(df)
+    record_access(fname)
+
+    def render():
+        if max_rows is None:
+            import pandas as pd
+
+            df = pd.read_csv(fname, **kwargs)
+            total_rows = None
+        else:
+            df, total_rows = _read_csv_excerpt(fname, max_rows, rows=rows, **kwargs)
+        if cols is not None:
+            df = df[cols]
+        return table(df, max_cols=max_cols, total_rows=total_rows)()
+
+    html = render_cache.get_or_render(
+        fname,
+        # read_csv kwargs may be unhashable (e.g. lists), so key on their repr
+        repr(("csv", cols, max_rows, max_cols, rows, sorted(kwargs.items()))),
+        render,
+    )
+
+    def template(*args, **kwargs):
+        return html
+
+    return template
 
 
 def indexed_csv(fname, cols=None, **kwargs):
@@ -105,47 +528,401 @@ def indexed_csv(fname, cols=None, **kwargs):
     return csv(fname, cols=cols, index_col=0, **kwargs)
 
 
-def textfile(fname, **kwargs):
+def _import_pyarrow(format_name):
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            f"Reading {format_name} files requires pyarrow: pip install pyarrow"
+        )
+    return pyarrow
+
+
+def _excerpt_batches(batches, n_batches, max_rows, rows):
+    """Collect whole record batches (or row groups) from the start or end of a file until they hold [max_rows] rows,
+    then trim them to [max_rows]. [batches](i) returns batch i of [n_batches], as an Arrow record batch or table.
+    Returns an Arrow table, or None if there are no batches.
+    """
+    import pyarrow as pa
+
+    order = range(n_batches) if rows == "head" else reversed(range(n_batches))
+    collected = []
+    n_rows = 0
+    for i in order:
+        if max_rows is not None and n_rows >= max_rows:
+            break
+        batch = batches(i)
+        collected.append(batch)
+        n_rows += batch.num_rows
+    if not collected:
+        return None
+    if rows == "tail":
+        collected.reverse()
+    table = pa.concat_tables(
+        pa.Table.from_batches([batch]) if isinstance(batch, pa.RecordBatch) else batch
+        for batch in collected
+    )
+    if max_rows is None or table.num_rows <= max_rows:
+        return table
+    if rows == "head":
+        return table.slice(0, max_rows)
+    return table.slice(table.num_rows - max_rows)
+
+
+def _read_parquet_excerpt(fname, cols, max_rows, rows):
+    """Read columns [cols] of the first or last [max_rows] rows of a Parquet file, decoding only the row groups needed.
+    Returns an Arrow table and the total number of rows in the file."""
+    pa = _import_pyarrow("Parquet")
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(fname, memory_map=True)
+    total_rows = parquet_file.metadata.num_rows
+    if max_rows is None or total_rows <= max_rows:
+        return parquet_file.read(columns=cols), total_rows
+    if rows == "head":
+        # decode pages only until max_rows rows are read
+        batch = next(parquet_file.iter_batches(batch_size=max_rows, columns=cols))
+        return pa.Table.from_batches([batch]), total_rows
+    table = _excerpt_batches(
+        lambda i: parquet_file.read_row_group(i, columns=cols),
+        parquet_file.num_row_groups,
+        max_rows,
+        rows,
+    )
+    return table, total_rows
+
+
+def _read_arrow_excerpt(fname, cols, max_rows, rows):
+    """Read columns [cols] of the first or last [max_rows] rows of a Feather (v2) or Arrow IPC file.
+    The file is memory-mapped, and only the selected columns of the batches needed are read (and decompressed).
+    Returns an Arrow table and the total number of rows in the file (None if unknown).
+    """
+    pa = _import_pyarrow("Feather and Arrow IPC")
+    import pyarrow.ipc
+
+    source = pa.memory_map(fname)
+    try:
+        schema = pa.ipc.open_file(source).schema
+        is_stream = False
+    except pa.ArrowInvalid:
+        # IPC stream format, which has no index of its batches
+        source.seek(0)
+        schema = pa.ipc.open_stream(source).schema
+        is_stream = True
+    options = None
+    if cols is not None:
+        missing = [col for col in cols if schema.get_field_index(col) < 0]
+        if missing:
+            raise KeyError(f"Columns not found: {missing}")
+        options = pa.ipc.IpcReadOptions(
+            included_fields=sorted(schema.get_field_index(col) for col in cols)
+        )
+    source.seek(0)
+
+    if is_stream:
+        reader = pa.ipc.open_stream(source, options=options)
+        batches = []
+        n_rows = 0
+        total_rows = None
+        for batch in reader:
+            batches.append(batch)
+            n_rows += batch.num_rows
+            if rows == "head" and max_rows is not None and n_rows >= max_rows:
+                break
+        else:
+            # read to the end
+            total_rows = n_rows
+        table = _excerpt_batches(batches.__getitem__, len(batches), max_rows, rows)
+    else:
+        reader = pa.ipc.open_file(source, options=options)
+        table = _excerpt_batches(
+            reader.get_batch, reader.num_record_batches, max_rows, rows
+        )
+        total_rows = reader.count_rows() if hasattr(reader, "count_rows") else None
+    if table is None:
+        table = schema.empty_table()
+    return (table if cols is None else table.select(cols)), total_rows
+
+
+def _columnar(read_excerpt, kind, fname, cols, max_rows, max_cols, rows):
+    """Render an excerpt of a columnar file read by [read_excerpt](fname, cols, max_rows, rows) as a table."""
+    if rows not in ["head", "tail"]:
+        raise ValueError(f"rows must be 'head' or 'tail', not {rows!r}")
+    record_access(fname)
+
+    def render():
+        import pandas as pd
+
+        table_, total_rows = read_excerpt(fname, cols, max_rows, rows)
+        df = table_.to_pandas()
+        if (
+            rows == "tail"
+            and total_rows is not None
+            and isinstance(df.index, pd.RangeIndex)
+            and df.index.start == 0
+        ):
+            # number rows by their position in the full file
+            df.index = pd.RangeIndex(total_rows - df.shape[0], total_rows)
+        return table(df, max_cols=max_cols, total_rows=total_rows)()
+
+    html = render_cache.get_or_render(
+        fname, repr((kind, cols, max_rows, max_cols, rows)), render
+    )
+
+    def template(*args, **kwargs):
+        return html
+
+    return template
+
+
+def parquet(fname, cols=None, max_rows=None, max_cols=None, rows="head"):
+    """
+    Read a Parquet file from [fname]. Optionally read only columns [cols]. Requires pyarrow.
+
+    Set [max_rows] to read only the first ("head") or last ("tail") rows, chosen by [rows].
+    Only the selected columns of the row groups holding those rows are decoded, so a preview of a huge file is quick.
+    The total number of rows, from the file's metadata, is reported below the table. [max_cols] limits the number of columns displayed.
+
+    Rendered HTML is cached until the file changes: see cache_info().
+    """
+    return _columnar(
+        _read_parquet_excerpt, "parquet", fname, cols, max_rows, max_cols, rows
+    )
+
+
+def feather(fname, cols=None, max_rows=None, max_cols=None, rows="head"):
+    """
+    Read a Feather (v2) or Arrow IPC file from [fname]. Optionally read only columns [cols]. Requires pyarrow.
+
+    The file is memory-mapped. Set [max_rows] to read only the first ("head") or last ("tail") rows, chosen by [rows].
+    Only the selected columns of the record batches holding those rows are read, so a preview of a huge file is quick.
+    The total number of rows is reported below the table. [max_cols] limits the number of columns displayed.
+
+    Rendered HTML is cached until the file changes: see cache_info().
+    """
+    return _columnar(
+        _read_arrow_excerpt, "feather", fname, cols, max_rows, max_cols, rows
+    )
+
+
+# Default limit on how much of a text file textfile() displays.
+TEXTFILE_MAX_BYTES = 256 * 1024
+
+
+def _text_excerpt_html(buffer, windows, encoding):
+    """Render byte ranges [windows] of [buffer] as escaped text, noting how many bytes were left out around them."""
+    import html
+
+    def omitted(n_bytes):
+        return f'<span style="color: gray">[... {n_bytes:,} bytes omitted ...]</span>\n'
+
+    parts = []
+    position = 0
+    for start, end in windows:
+        if start > position:
+            parts.append(omitted(start - position))
+        text = buffer[start:end].decode(encoding, errors="replace")
+        parts.append(html.escape(text, quote=False))
+        if not text.endswith("\n") and end < len(buffer):
+            # a line was cut
+            parts.append("\n")
+        position = end
+    if position < len(buffer):
+        parts.append(omitted(len(buffer) - position))
+    return "<pre>{}</pre>".format("".join(parts))
+
+
+def textfile(
+    fname,
+    max_bytes=TEXTFILE_MAX_BYTES,
+    max_lines=None,
+    lines="head",
+    grep=None,
+    context=0,
+    encoding="utf-8",
+    **kwargs,
+):
     """
     Read a text file and render as plain text.
+
+    Files larger than [max_bytes] (default 256 KB; None for no limit), or with more than [max_lines] lines, are excerpted,
+    chosen by [lines]:
+        - "head": the start of the file.
+        - "tail": the end of the file.
+        - "both": the start and the end, half of the budget each.
+    Set [grep] to a regular expression to show the lines matching it instead, with [context] lines before and after each match.
+    Excerpts consist of whole lines where possible, and note how many bytes were left out.
+    The file is memory-mapped, so only the excerpt is read, however large the file is.
+
+    Rendered HTML is cached until the file changes: see cache_info().
+    """
+    import mmap
+
+    if lines not in ["head", "tail", "both"]:
+        raise ValueError(f"lines must be 'head', 'tail', or 'both', not {lines!r}")
+    record_access(fname)
+
+    def render():
+        with open(fname, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # empty files can't be memory-mapped
+                return plaintext("")()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                size = len(buffer)
+                budget = size if max_bytes is None else max_bytes
+                if grep is not None:
+                    windows = _grep_windows(buffer, grep, context, budget, max_lines)
+                elif size <= budget and max_lines is None:
+                    windows = [(0, size)]
+                elif lines == "head":
+                    windows = [(0, _head_window(buffer, 0, budget, max_lines))]
+                elif lines == "tail":
+                    windows = [(_tail_window(buffer, size, budget, max_lines), size)]
+                else:
+                    half_lines = None if max_lines is None else (max_lines + 1) // 2
+                    head_end = _head_window(buffer, 0, (budget + 1) // 2, half_lines)
+                    tail_start = _tail_window(buffer, size, budget // 2, half_lines)
+                    windows = [(0, head_end), (max(head_end, tail_start), size)]
+                return _text_excerpt_html(buffer, windows, encoding)
+
+    html = render_cache.get_or_render(
+        fname,
+        ("textfile", max_bytes, max_lines, lines, grep, context, encoding),
+        render,
+    )
+
+    def template(*args, **kwargs):
+        return html
+
+    return template
+
+
+def cache_info():
+    """Report statistics of the cache of HTML rendered from files by csv() and textfile().
+
+    :return: hits, misses, number of entries, size of cached HTML, and the size limit.
+    :rtype: CacheInfo
     """
-    with open(fname, "r") as f:
-        text = f.read()
-        return plaintext(text)
+    return render_cache.info()
+
+
+def cache_clear():
+    """Empty the cache of rendered HTML and reset its statistics."""
+    render_cache.clear()
+
+
+def set_cache_budget(max_bytes):
+    """Limit the total size of cached HTML. Least recently used entries are evicted to fit. Default 256 MB.
+
+    :param max_bytes: size limit. Set to 0 to disable caching.
+    :type max_bytes: int
+    """
+    render_cache.resize(max_bytes)
 
 
 """Main logic."""
 
 
-def _get_template(user_input):
-    """Return executable template function if not provided, based on filename."""
+"""Renderers that show() picks for files. Add more with register_renderer()."""
+
+# Files that match no renderer are shown as images, as they always have been, but with a warning.
+renderers = RendererRegistry(fallback="image")
+register_renderer = renderers.register
+
+
+def _image_file(fname, thumbnails=False, embed=False, dedupe=False):
+    # takes show()'s option names
+    return image(fname, thumbnail=thumbnails, embed=embed, dedupe=dedupe)
+
+
+register_renderer(
+    _image_file,
+    name="image",
+    extensions=[".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".bmp", ".avif"],
+    mime_types=["image/*"],
+    magic=[b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a", (8, b"WEBP")],
+)
+register_renderer(
+    textfile,
+    extensions=[".txt", ".log"],
+    mime_types=["text/*", "application/json"],
+)
+register_renderer(
+    csv,
+    extensions=[".csv"] + [".csv" + extension for extension in _compressed_extensions],
+    mime_types=["text/csv"],
+)
+register_renderer(
+    csv,
+    name="tsv",
+    extensions=[".tsv"] + [".tsv" + extension for extension in _compressed_extensions],
+    mime_types=["text/tab-separated-values"],
+    sep="\t",
+)
+register_renderer(parquet, extensions=[".parquet", ".pq"], magic=[b"PAR1"])
+register_renderer(
+    feather,
+    extensions=[".feather", ".arrow", ".arrows", ".ipc"],
+    mime_types=[
+        "application/vnd.apache.arrow.file",
+        "application/vnd.apache.arrow.stream",
+    ],
+    magic=[b"ARROW1"],
+)
+
+
+def _get_template(
+    user_input,
+    thumbnails=False,
+    embed=False,
+    dedupe=False,
+    max_rows=None,
+    max_cols=None,
+):
+    """Return executable template function if not provided, based on filename: see renderers.
+    [thumbnails], [embed], [dedupe], [max_rows] and [max_cols] are passed on to renderers that accept them,
+    e.g. thumbnails, embed and dedupe to image(), and max_rows and max_cols to csv(), parquet() and feather().
+    """
     if callable(user_input):
         # this is already a template function
         return user_input
 
     # user provided a filename
-    # get extension
-    extension = os.path.splitext(user_input)[1]
+    return renderers.render(
+        user_input,
+        thumbnails=thumbnails,
+        embed=embed,
+        dedupe=dedupe,
+        max_rows=max_rows,
+        max_cols=max_cols,
+    )
 
-    # detect different table types
-    if extension == ".csv":
-        return csv(user_input)
-    elif extension == ".tsv":
-        return csv(user_input, sep="\t")
-    elif extension == ".txt":
-        return textfile(user_input)
 
-    # assume it's an image
-    return image(user_input)
+def _is_array(obj):
+    """Whether [obj] is a NumPy array or array-like, such as a pandas Series, checked without importing NumPy."""
+    return hasattr(obj, "ndim") and hasattr(obj, "tolist")
 
 
 def _ensure_list_of_lists(entries):
-    """Transform input to being a list of lists."""
+    """Transform input to being a list of lists.
+    Arrays are converted to lists, and iterators, such as rows from chunks() of a generator, are consumed here.
+    """
+    from collections.abc import Iterator
+
+    if _is_array(entries):
+        entries = entries.tolist()
+    elif isinstance(entries, Iterator):
+        entries = list(entries)
     if not isinstance(entries, list):
         # user passed in single object
         # wrap in a list
         # (next transformation will make this a list of lists)
         entries = [entries]
+    if any(_is_array(element) for element in entries):
+        # e.g. a list of rows sliced from an array
+        entries = [
+            element.tolist() if _is_array(element) else element for element in entries
+        ]
     if not any(isinstance(element, list) for element in entries):
         # user passed in a list of objects, not a list of lists
         # wrap in a list
@@ -153,107 +930,452 @@ def _ensure_list_of_lists(entries):
     return entries
 
 
-def _flatten(lst):
-    """Flatten sublists in list.
-    see https://stackoverflow.com/a/952952/130164
+def _iter_flat(lst):
+    """Yield the items of [lst], descending into sublists, arrays and iterators.
+    Iterative, with a stack of iterators over the sublists being flattened, so deep nesting doesn't hit the recursion
+    limit and sublists aren't copied into intermediate lists.
     """
-    from collections.abc import Sequence
-
-    entries = []
-    for sublist in lst:
-        # may be a sublist
-        if isinstance(sublist, Sequence) and not isinstance(
-            sublist, (str, bytes, bytearray)
-        ):
-            # recursively flatten sublist
-            entries.extend(_flatten(sublist))
+    from collections.abc import Iterator, Sequence
+
+    stack = [iter(lst)]
+    while stack:
+        for item in stack[-1]:
+            # may be a sublist. Strings are checked first: they're the common case, and the Sequence check is slower.
+            if isinstance(item, (str, bytes, bytearray)):
+                yield item
+            elif isinstance(item, (Sequence, Iterator)):
+                # descend into the sublist, then resume this one where we left off
+                stack.append(iter(item))
+                break
+            elif _is_array(item) and item.ndim > 0:
+                stack.append(iter(item.tolist()))
+                break
+            else:
+                # just an item
+                yield item
         else:
-            # just an item
-            entries.append(sublist)
-    return entries
+            # sublist exhausted
+            stack.pop()
+
+
+def _flatten(lst):
+    """Flatten sublists in list."""
+    return list(_iter_flat(lst))
+
+
+def _iter_rows(entries, n_col):
+    """Yield rows of [n_col] entries from the flat list [entries]. The last row is shorter if entries don't divide evenly."""
+    for start in range(0, len(entries), n_col):
+        yield entries[start : start + n_col]
+
+
+def _iter_rows_lazily(entries, n_rows, n_col):
+    """Yield rows of [n_col] entries from the iterable [entries], consuming it only as rows are requested.
+    If [n_rows] is given, the number of entries is verified once they run out."""
+    flat = _iter_flat(entries)
+    n_entries = 0
+    while True:
+        row = list(itertools.islice(flat, n_col))
+        if not row:
+            break
+        n_entries += len(row)
+        yield row
+    if n_rows is not None:
+        assert n_entries == n_rows * n_col, "Wrong length."
+
+
+def _reshape_array(entries, n_rows, n_col):
+    """Reshape the array [entries] into a list of rows of [n_col] entries, with one reshape rather than per entry."""
+    import numpy as np
+
+    flat = np.asarray(entries).ravel()
+    if n_rows is not None:
+        assert len(flat) == n_rows * n_col, "Wrong length."
+    n_full_rows = len(flat) // n_col
+    reshaped = flat[: n_full_rows * n_col].reshape(n_full_rows, n_col).tolist()
+    if len(flat) % n_col > 0:
+        # handle remainder with an uneven row
+        reshaped.append(flat[n_full_rows * n_col :].tolist())
+    return reshaped
 
 
 def chunks(entries, shape):
     """Reshape [entries] into chunks of shape [shape], which can be:
     - a (number of rows, number of columns) tuple, in which case we verify length
-    - or simply a number of columns, in which case we guess the right number of rows, and allow in-complete rows."""
-    # Flatten entries
-    entries = _flatten(entries)
+    - or simply a number of columns, in which case we guess the right number of rows, and allow in-complete rows.
+
+    [entries] may be (nested) lists, a NumPy array or pandas Series, or any other iterable:
+    - Iterators, like generators or glob.iglob(), are consumed lazily: a generator of rows is returned,
+      which show() accepts too. With a (rows, columns) shape, the length is verified after the last row.
+    - Everything else, e.g. lists, arrays, sets or dict.values(), is reshaped into a list of rows.
+    """
+    from collections.abc import Iterator, Sequence
 
     if isinstance(shape, list) or isinstance(shape, tuple):
         assert len(shape) <= 2, "Only supports 2D arrays"
-        if len(shape) == 2:
-            # Confirm length
-            assert len(entries) == shape[0] * shape[1], "Wrong length."
 
-    # Convert shape to (n_rows, n_cols) tuple.
+    # Convert shape to (n_rows, n_cols) tuple, with n_rows None if not given.
     if not isinstance(shape, list) and not isinstance(shape, tuple):
         # Input was a single object.
-        shape = (0, shape)
+        shape = (None, shape)
     if len(shape) == 1:
         # Input was a list of tuple of length 1.
-        shape = (0, shape[0])
+        shape = (None, shape[0])
+    n_rows, n_col = shape
 
-    n_col = shape[1]
-    reshaped = [
-        entries[row_num * n_col : (row_num + 1) * n_col]
-        for row_num in range(len(entries) // n_col)
-    ]
-    if len(entries) % n_col > 0:
-        # handle remainder with an uneven row
-        reshaped.append(entries[(len(entries) // n_col) * n_col :])
-    return reshaped
+    if _is_array(entries):
+        return _reshape_array(entries, n_rows, n_col)
+    if isinstance(entries, Iterator):
+        return _iter_rows_lazily(entries, n_rows, n_col)
+    if not isinstance(entries, Sequence):
+        # e.g. a set or dict.values(): may be iterated again, so return a list, as for lists
+        entries = list(entries)
+
+    # Flatten entries
+    entries = _flatten(entries)
+    if n_rows is not None:
+        # Confirm length
+        assert len(entries) == n_rows * n_col, "Wrong length."
+    return list(_iter_rows(entries, n_col))
 
 
-def _make_HTML(entries, headers, max_width, max_height):
+def _render_error(entry, error):
+    """Render an exception raised while rendering [entry] in place of the cell's contents."""
+    import html
+
+    source = entry if isinstance(entry, str) else "template"
+    return '<pre style="color: red; text-align: left">{}</pre>'.format(
+        html.escape(f"{source}: {type(error).__name__}: {error}")
+    )
+
+
+def _call_template(template, max_width, max_height, embedded_images=None):
+    """Render [template]. Templates that embed images, from image(), also get the output's [embedded_images]."""
+    if embedded_images is not None and getattr(template, "embeds_images", False):
+        return template(max_width, max_height, embedded_images=embedded_images)
+    return template(max_width, max_height)
+
+
+def _render_cell(
+    entry,
+    max_width,
+    max_height,
+    inline_errors=False,
+    profiler=None,
+    position=None,
+    embedded_images=None,
+    **template_options,
+):
+    """Resolve [entry] to a template function and render it to HTML.
+    If [inline_errors], exceptions are rendered into the cell rather than raised.
+    If [profiler] is given, timings are recorded under [position], a (show number, row, column) tuple.
+    [embedded_images] tracks the images embedded so far in this output: see image(dedupe=True).
     """
-    Create HTML table.
+    try:
+        if profiler is None:
+            return _call_template(
+                _get_template(entry, **template_options),
+                max_width,
+                max_height,
+                embedded_images,
+            )
+        return profiler.time_cell(
+            *position,
+            entry,
+            load=lambda: _get_template(entry, **template_options),
+            render=lambda template: _call_template(
+                template, max_width, max_height, embedded_images
+            ),
+        )
+    except Exception as e:
+        if not inline_errors:
+            raise
+        return _render_error(entry, e)
+
+
+# Sequential ids keep output deterministic across notebook executions, unlike random ids.
+_paginated_grid_ids = itertools.count()
+
+# Swaps the page of rows shown in a paginated grid with the rows pre-rendered in its inert <template> elements.
+_paginated_grid_script = """<script>
+(function () {{
+  var grid = document.getElementById("{grid_id}");
+  var pages = grid.querySelectorAll("template.summarynb-page");
+  var body = grid.querySelector("tbody.summarynb-page");
+  var label = grid.querySelector(".summarynb-page-label");
+  var current = 0;
+  label.textContent = "Page 1 of " + pages.length;
+  function go(page) {{
+    if (page < 0 || page >= pages.length) return;
+    current = page;
+    body.replaceChildren(pages[page].content.cloneNode(true));
+    label.textContent = "Page " + (page + 1) + " of " + pages.length;
+  }}
+  grid.querySelector(".summarynb-page-previous").onclick = function () {{ go(current - 1); }};
+  grid.querySelector(".summarynb-page-next").onclick = function () {{ go(current + 1); }};
+}})();
+</script>"""
+
+
+def _write_rows(write, cells):
+    """Write a <tr> for each row of [cells] (rows of cell HTML) to [write], separated by newlines."""
+    for row_num, row in enumerate(cells):
+        write("<tr>" if row_num == 0 else "\n<tr>")
+        for col_num, cell in enumerate(row):
+            write(
+                '<td style="text-align: center">'
+                if col_num == 0
+                else '\n<td style="text-align: center">'
+            )
+            write(cell)
+            write("</td>")
+        write("</tr>")
+
+
+def _header_html(headers):
+    if headers is None:
+        return ""
+    return "<tr>{}</tr>".format(
+        "\n".join(
+            '<th style="text-align: center">%s</th>' % str(header).strip()
+            for header in headers
+        )
+    )
+
+
+def _write_paginated(write, cells, header_html, page_size, page, total_rows, grid_id):
+    """Write [cells] as a table showing one page of [page_size] rows at a time.
+
+    If [page] (1-based) is given, [cells] are that page's rows only, and a static table is written.
+    Otherwise [cells] are all rows: the first page is shown, and every page is also pre-rendered into an inert <template>,
+    whose contents are swapped into the table by the previous/next buttons. Browsers don't lay out or load images for
+    <template> contents, so the live page stays small however many rows there are.
+    The buttons need the script to run: in untrusted notebooks, the label says so, and only the first page is shown.
     """
+    n_pages = max(1, math.ceil(total_rows / page_size))
+    if page is not None:
+        first_row = (page - 1) * page_size
+        write("<table>")
+        write(header_html)
+        _write_rows(write, cells)
+        write(
+            f"</table><p>Page {page} of {n_pages} "
+            f"(rows {first_row + 1}-{first_row + len(cells)} of {total_rows})</p>"
+        )
+        return
+
+    # the first page is written twice, live and in its template, so keep its pieces
+    first_page = []
+    _write_rows(first_page.append, cells[:page_size])
+    write(
+        f'<div id="{grid_id}">\n<table><thead>{header_html}</thead><tbody class="summarynb-page">'
+    )
+    for part in first_page:
+        write(part)
+    write("</tbody></table>")
+    # an empty grid still has one (empty) page
+    for start in range(0, max(total_rows, 1), page_size):
+        write('\n<template class="summarynb-page">')
+        if start == 0:
+            for part in first_page:
+                write(part)
+        else:
+            _write_rows(write, cells[start : start + page_size])
+        write("</template>")
+    write(
+        '\n<div><button class="summarynb-page-previous">&laquo; Previous</button> '
+        # replaced by the script, which doesn't run in untrusted notebooks
+        f'<span class="summarynb-page-label">Page 1 of {n_pages}. '
+        "Trust the notebook to see the other pages.</span> "
+        '<button class="summarynb-page-next">Next &raquo;</button></div>\n'
+    )
+    write(_paginated_grid_script.format(grid_id=grid_id))
+    write("\n</div>")
+
 
-    def wrap_in_column(contents):
-        return """<td style="text-align: center">{contents}</td>""".format(
-            contents=contents
+def _assemble_HTML(
+    cells, headers, page_size=None, page=None, total_rows=None, grid_id=None
+):
+    """Assemble [cells] (rows of cell HTML) into a table, in a single pass that appends pieces to one buffer and joins
+    them once at the end. If [page_size] is set, see _write_paginated(); [total_rows] defaults to the number of rows.
+    """
+    parts = []
+    write = parts.append
+    header_html = _header_html(headers)
+    if page_size is None:
+        write("<table>")
+        write(header_html)
+        _write_rows(write, cells)
+        write("</table>")
+    else:
+        if total_rows is None:
+            total_rows = len(cells)
+        if grid_id is None and page is None:
+            grid_id = f"summarynb-grid-{next(_paginated_grid_ids)}"
+        _write_paginated(
+            write, cells, header_html, page_size, page, total_rows, grid_id
         )
+    return "".join(parts)
 
-    def wrap_in_row(contents):
-        return """<tr>{contents}</tr>""".format(contents=contents)
-
-    def make_headers(headers):
-        if headers is not None:
-            return """<tr>{contents}</tr>""".format(
-                contents="\n".join(
-                    [
-                        """<th style="text-align: center">%s</th>"""
-                        % str(header).strip()
-                        for header in headers
-                    ]
-                )
-            )
-        return ""
 
-    def wrap_in_table(contents):
-        return """<table>{contents}</table>""".format(contents=contents)
+def _check_pagination(page_size, page):
+    if page_size is not None and page_size < 1:
+        raise ValueError(f"page_size must be at least 1, not {page_size}")
+    if page is not None and page_size is None:
+        raise ValueError("page requires page_size")
+
+
+def _page_rows(n_rows, page_size, page):
+    """The (first, last + 1) rows to render: all [n_rows], or only those of [page] if given."""
+    if page_size is None or page is None:
+        return 0, n_rows
+    n_pages = max(1, math.ceil(n_rows / page_size))
+    if not 1 <= page <= n_pages:
+        raise ValueError(f"page must be between 1 and {n_pages}, not {page}")
+    first_row = (page - 1) * page_size
+    return first_row, min(first_row + page_size, n_rows)
+
+
+def _render_placeholder(entry):
+    """Stand-in for a cell that is still rendering."""
+    import html
+
+    name = entry if isinstance(entry, str) else "template"
+    return '<span style="color: gray">Loading {}&hellip;</span>'.format(
+        html.escape(name)
+    )
+
+
+def _make_HTML(
+    entries,
+    headers,
+    max_width,
+    max_height,
+    workers=None,
+    profiler=None,
+    show_number=None,
+    page_size=None,
+    page=None,
+    on_progress=None,
+    progress_interval=0.1,
+    **template_options,
+):
+    """
+    Create HTML table.
+    If [workers] is set, cells are loaded and rendered concurrently in that many threads, and errors are shown in their cells.
+    If [profiler] is set, each cell's timings are recorded under [show_number].
+    If [page_size] is set, rows are split into pages: see _write_paginated(). Only [page] is rendered if given.
+    If [on_progress] is set, it is called with HTML of the grid before any cell is rendered, with placeholders in every cell,
+    and then as cells finish rendering, at most every [progress_interval] seconds. Errors are shown in their cells.
+    [template_options] are passed on to _get_template().
+    """
+
+    _check_pagination(page_size, page)
 
     # Transform to list of lists (list of rows that are each a list of columns), if user passed in single object (1 row, 1 column) or a single list (1 row, many columns)
     entries = _ensure_list_of_lists(entries)
 
-    # Make HTML for each row
-    rows = [
-        "\n".join(
-            [
-                wrap_in_column(_get_template(template)(max_width, max_height))
-                for template in row
-            ]
-        )
-        for row in entries
+    # Choose rows to render
+    first_row, last_row = _page_rows(len(entries), page_size, page)
+    positions = [
+        (row_num, col_num)
+        for row_num in range(first_row, last_row)
+        for col_num in range(len(entries[row_num]))
     ]
-    # assemble rows into table
-    return wrap_in_table(
-        make_headers(headers) + "\n".join([wrap_in_row(row) for row in rows])
+    # the same id across progress updates, so the pagination script of the final grid matches earlier ones
+    grid_id = (
+        f"summarynb-grid-{next(_paginated_grid_ids)}"
+        if page_size is not None and page is None
+        else None
     )
 
+    embedded_images = _EmbeddedImages()
+
+    def assemble(cells):
+        return embedded_images.finish(
+            _assemble_HTML(
+                cells,
+                headers,
+                page_size=page_size,
+                page=page,
+                total_rows=len(entries),
+                grid_id=grid_id,
+            )
+        )
 
-def show(entries, headers=None, max_width=800, max_height=800):
+    # Make HTML for each cell
+    render = functools.partial(
+        _render_cell,
+        max_width=max_width,
+        max_height=max_height,
+        inline_errors=workers is not None or on_progress is not None,
+        profiler=profiler,
+        embedded_images=embedded_images,
+        **template_options,
+    )
+    cells = [[None] * len(entries[row_num]) for row_num in range(first_row, last_row)]
+    last_progress = time.perf_counter()
+    if on_progress is not None:
+        for row_num, col_num in positions:
+            cells[row_num - first_row][col_num] = _render_placeholder(
+                entries[row_num][col_num]
+            )
+        on_progress(assemble(cells))
+
+    def finished(row_num, col_num, html):
+        nonlocal last_progress
+        cells[row_num - first_row][col_num] = html
+        if (
+            on_progress is not None
+            and time.perf_counter() - last_progress >= progress_interval
+        ):
+            on_progress(assemble(cells))
+            last_progress = time.perf_counter()
+
+    if workers is None:
+        for row_num, col_num in positions:
+            finished(
+                row_num,
+                col_num,
+                render(
+                    entries[row_num][col_num],
+                    position=(show_number, row_num, col_num),
+                ),
+            )
+    else:
+        # loading is dominated by file reads, which release the GIL, so threads overlap well.
+        # submit every cell up front, then fill in results as they complete.
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    render,
+                    entries[row_num][col_num],
+                    position=(show_number, row_num, col_num),
+                ): (row_num, col_num)
+                for row_num, col_num in positions
+            }
+            for future in as_completed(futures):
+                finished(*futures[future], future.result())
+
+    return assemble(cells)
+
+
+def show(
+    entries,
+    headers=None,
+    max_width=800,
+    max_height=800,
+    thumbnails=False,
+    embed=False,
+    dedupe=False,
+    max_rows=None,
+    max_cols=None,
+    workers=None,
+    profile=False,
+    page_size=None,
+    page=None,
+    progressive=False,
+):
     """
     Display chosen figures and tables in an HTML table.
 
@@ -268,12 +1390,199 @@ def show(entries, headers=None, max_width=800, max_height=800):
         - [max_width]: set max pixel width for images, default 800px. set to None to disable max width.
 
         - [max_height]: set max pixel height for images, default 800px. set to None to disable max height.
+
+        - [thumbnails]: show images given by filename as lazy-loaded, downscaled thumbnails that link to the full-resolution files. Keeps large grids of big images fast in the browser. Requires Pillow. Default False.
+
+        - [embed]: embed images given by filename into the notebook as data URIs, so it displays anywhere without the image files. Set to "webp" or "jpeg" to recompress images first, to keep the notebook small (requires Pillow). Default False.
+
+        - [dedupe]: with [embed], embed an image shown several times in this grid only once, pointing later copies at the first with a script. The copies only display where the notebook's JavaScript runs (i.e. trusted notebooks, not GitHub or nbviewer). Default False.
+
+        - [max_rows]: read and show at most this many rows of tables given by filename, default None (all rows). Large files are not read past the rows shown.
+
+        - [max_cols]: show at most this many columns of tables given by filename, default None (all columns).
+
+        - [workers]: load and render cells concurrently in this many threads, default None (one at a time). Speeds up grids of many files, especially on network filesystems. Cells that fail to render show their error instead of aborting the whole grid.
+
+        - [profile]: show a table of how long each cell took to load and render, how many bytes it read, and how much HTML it produced, slowest first. Default False. To profile several show() calls, or to export timings, use `with summarynb.profile() as profiler:` instead.
+
+        - [page_size]: show this many rows at a time, with buttons to page through the rest, default None (show all rows). Keeps the browser responsive for grids of thousands of entries: only the current page is live in the page, but all pages are still rendered into the notebook, so the notebook is no smaller. The buttons work with a script, so they only work where the notebook's JavaScript runs (i.e. trusted notebooks, not GitHub or nbviewer). Notebooks executed by `summarynb run` aren't trusted until you trust them (`jupyter trust`); until then only the first page is shown.
+
+        - [page]: with [page_size], render only this page (starting from 1), so the notebook holds just that page. Needs no script. Only [page], not [page_size] alone, makes the notebook smaller. Default None (all pages, with buttons).
+
+        - [progressive]: display the grid right away, with placeholders, and fill in cells as they finish rendering. Combine with [workers] to render several cells at once. Cells that fail to render show their error. Default False.
+    """
+    profiler = Profiler() if profile else active_profiler()
+    show_number = profiler.next_show_number() if profiler is not None else None
+    from IPython.display import HTML, DisplayHandle, display
+
+    display_handle = DisplayHandle()
+    displayed = False
+
+    def on_progress(partial_html):
+        nonlocal displayed
+        if not displayed:
+            display_handle.display(HTML(partial_html))
+            displayed = True
+        else:
+            display_handle.update(HTML(partial_html))
+
+    start = time.perf_counter()
+    html = _make_HTML(
+        entries,
+        headers=headers,
+        max_width=max_width,
+        max_height=max_height,
+        thumbnails=thumbnails,
+        embed=embed,
+        dedupe=dedupe,
+        max_rows=max_rows,
+        max_cols=max_cols,
+        workers=workers,
+        profiler=profiler,
+        show_number=show_number,
+        page_size=page_size,
+        page=page,
+        on_progress=on_progress if progressive else None,
+    )
+    laid_out = time.perf_counter()
+    if progressive:
+        display_handle.update(HTML(html))
+        result = None
+    else:
+        result = display(HTML(html))
+
+    if profiler is not None:
+        profiler.record_display(
+            show_number,
+            start=start,
+            layout_seconds=laid_out - start,
+            display_seconds=time.perf_counter() - laid_out,
+            html=html,
+        )
+    if profile:
+        display(HTML(profiler.summary().to_html()))
+    return result
+
+
+"""Async API, for rendering without blocking an event loop."""
+
+
+def _running_loop():
+    import asyncio
+
+    # get_running_loop() is new in Python 3.7. Inside a coroutine, get_event_loop() returns the same loop.
+    return getattr(asyncio, "get_running_loop", asyncio.get_event_loop)()
+
+
+async def csv_async(fname, cols=None, executor=None, **kwargs):
+    """
+    Like csv(), but reads the file in [executor] (default: the event loop's default thread pool), without blocking the event loop.
+    Await it to get the template function.
+    """
+    loop = _running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(csv, fname, cols=cols, **kwargs)
+    )
+
+
+async def textfile_async(fname, executor=None, **kwargs):
+    """
+    Like textfile(), but reads the file in [executor] (default: the event loop's default thread pool), without blocking the event loop.
+    Await it to get the template function.
+    """
+    loop = _running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(textfile, fname, **kwargs)
+    )
+
+
+async def make_html_async(
+    entries,
+    headers=None,
+    max_width=800,
+    max_height=800,
+    executor=None,
+    page_size=None,
+    page=None,
+    thumbnails=False,
+    embed=False,
+    dedupe=False,
+    max_rows=None,
+    max_cols=None,
+):
+    """
+    Create the HTML table that show() would display, without blocking the event loop.
+
+    Accepts the same [entries] as show(), plus awaitables of template functions, such as csv_async("results.csv").
+    Every cell is loaded and rendered in [executor] (default: the event loop's default thread pool), and all cells are gathered concurrently.
+    [page_size], [page], [thumbnails], [embed], [dedupe], [max_rows] and [max_cols] are as for show().
+    show()'s other options control how cells are scheduled, which [executor] does here, so they aren't accepted.
+    """
+    import asyncio
+    import inspect
+
+    _check_pagination(page_size, page)
+    loop = _running_loop()
+    embedded_images = _EmbeddedImages()
+    template_options = dict(
+        thumbnails=thumbnails,
+        embed=embed,
+        dedupe=dedupe,
+        max_rows=max_rows,
+        max_cols=max_cols,
+    )
+
+    async def render(entry):
+        if inspect.isawaitable(entry):
+            template = await entry
+        else:
+            template = await loop.run_in_executor(
+                executor, functools.partial(_get_template, entry, **template_options)
+            )
+        return await loop.run_in_executor(
+            executor, _call_template, template, max_width, max_height, embedded_images
+        )
+
+    entries = _ensure_list_of_lists(entries)
+    first_row, last_row = _page_rows(len(entries), page_size, page)
+    rendered = await asyncio.gather(
+        *[
+            asyncio.gather(*[render(entry) for entry in row])
+            for row in entries[first_row:last_row]
+        ]
+    )
+
+    # lay out the rendered cells exactly as show() would
+    return embedded_images.finish(
+        _assemble_HTML(
+            rendered, headers, page_size=page_size, page=page, total_rows=len(entries)
+        )
+    )
+
+
+async def show_async(
+    entries,
+    headers=None,
+    max_width=800,
+    max_height=800,
+    executor=None,
+    **options,
+):
+    """
+    Like show(), but loads and renders cells concurrently without blocking the event loop: `await show_async(...)`.
+    See make_html_async() for the accepted entries and options.
     """
+    from IPython.display import HTML, display
 
     return display(
         HTML(
-            _make_HTML(
-                entries, headers=headers, max_width=max_width, max_height=max_height
+            await make_html_async(
+                entries,
+                headers=headers,
+                max_width=max_width,
+                max_height=max_height,
+                executor=executor,
+                **options,
             )
         )
     )
@@ -0,0 +1,94 @@
+"""Process-wide cache of HTML rendered from files, so that re-running a summary cell doesn't re-read unchanged files."""
+import collections
+import os
+import threading
+
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "entries", "current_bytes", "max_bytes"]
+)
+
+
+class RenderCache:
+    """Least-recently-used cache of rendered HTML, keyed on (file path, mtime, size, render options).
+
+    A changed file gets a new key, so stale renders are never served. Entries are evicted, least recently used first,
+    once the total size of cached HTML exceeds [max_bytes]. Safe to use from multiple threads.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        # (path, options) -> current key, so that renders of an outdated version of a file can be dropped right away
+        self._latest = {}
+        self._current_bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_render(self, fname, options, render):
+        """Return cached HTML for [fname] rendered with [options], or call [render]() to produce and cache it.
+        [options] must be hashable. Anything that isn't a path to an existing file bypasses the cache.
+        """
+        if not isinstance(fname, (str, os.PathLike)) or not os.path.isfile(fname):
+            return render()
+        stat = os.stat(fname)
+        path = os.path.abspath(fname)
+        key = (path, stat.st_mtime_ns, stat.st_size, options)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+
+        html = render()
+
+        with self._lock:
+            outdated_key = self._latest.get((path, options))
+            if outdated_key is not None and outdated_key != key:
+                self._evict(outdated_key)
+            if key not in self._entries and len(html) <= self.max_bytes:
+                self._entries[key] = html
+                self._latest[(path, options)] = key
+                self._current_bytes += len(html)
+                self._shrink()
+        return html
+
+    def _evict(self, key):
+        html = self._entries.pop(key, None)
+        if html is not None:
+            self._current_bytes -= len(html)
+            path, _, _, options = key
+            if self._latest.get((path, options)) == key:
+                del self._latest[(path, options)]
+
+    def _shrink(self):
+        while self._current_bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._shrink()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+            self._current_bytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                entries=len(self._entries),
+                current_bytes=self._current_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+
+# Sizes are measured in characters of HTML, which is close enough to bytes for a memory budget.
+render_cache = RenderCache(max_bytes=256 * 1024 * 1024)
@@ -1,10 +1,33 @@
 """Console script for summarynb."""
+
 import sys
 import click
 import os
 import stat
 import subprocess
-import pandas as pd
+import tempfile
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .execution import (
+    ExecutionResult,
+    KernelPool,
+    execute_with_kernel,
+    execute_with_nbconvert,
+    print_prefixed,
+)
+from .config import SETTINGS, NotebookConfig, edit_config
+from .deps import DEPS_FILE_ENV, DependencyStore, read_accesses
+from .history import (
+    RunRecord,
+    append_runs,
+    format_size,
+    parse_size,
+    read_runs,
+    summarize,
+)
+from .runcache import RunCache, hash_file
+from .watch import dependency_graph
 
 
 @click.group()
@@ -29,6 +52,21 @@ def path_to_config_file():
     return os.path.join(git_root_path(), ".summarynb.config")
 
 
+def path_to_run_cache():
+    # local record of notebooks' last successful runs; not meant to be committed
+    return os.path.join(git_root_path(), ".summarynb.cache")
+
+
+def path_to_deps_file():
+    # input files each notebook read during its last run, recorded by `summarynb run`
+    return os.path.join(git_root_path(), ".summarynb.deps")
+
+
+def path_to_history_file():
+    # durations and memory use of every notebook run on this machine; not meant to be committed
+    return os.path.join(git_root_path(), ".summarynb.history")
+
+
 def path_to_hook():
     githooks_dir = os.path.join(git_root_path(), ".git/hooks")
     assert os.path.isdir(githooks_dir), "not a git repo!"
@@ -46,7 +84,7 @@ hook_template = """#!/usr/bin/env python
 import sys
 from summarynb import cli
 if __name__ == '__main__':
-    sys.exit(cli.run())
+    sys.exit(cli.run(["--staged"]))
 """
 
 
@@ -81,24 +119,29 @@ def uninstall():
 
 
 def get_or_create_metadata():
-    # retrieves or creates metadata file
-    fname = path_to_config_file()
-    if os.path.exists(fname):
-        return pd.read_csv(fname).drop_duplicates()
-    return pd.DataFrame(data=None, index=[], columns=["filename"], dtype="object")
-
-
-def write_metadata(df):
-    # writes metadata file
-    df.drop_duplicates().to_csv(path_to_config_file(), index=None)
+    # retrieves metadata, or an empty autorun list if there is no metadata file yet
+    return NotebookConfig(path_to_config_file())
 
 
 @main.command(name="list")
 def list_nb():
     """reports which notebooks are registered for autorun, and whether they are found on disk"""
-    df = get_or_create_metadata()
-    df["exists"] = df["filename"].apply(os.path.exists)
-    print(df)
+    config = get_or_create_metadata()
+    setting_names = [
+        name
+        for name in SETTINGS
+        if any(name in config.settings(fname) for fname in config.filenames())
+    ]
+    rows = [["filename", "exists"] + setting_names]
+    for fname in config.filenames():
+        settings = config.settings(fname)
+        rows.append(
+            [fname, str(os.path.exists(fname))]
+            + [str(settings.get(name, "-")) for name in setting_names]
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
 
 
 def prune_nb():
@@ -108,13 +151,37 @@ def prune_nb():
 
 @main.command()
 @click.argument("filepath")
-def mark(filepath):
-    """registers a notebook for autorun"""
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Stop this notebook if it runs for longer than this many seconds.",
+)
+@click.option(
+    "--memory-limit", default=None, help="Limit this notebook's memory, e.g. 2G."
+)
+@click.option(
+    "--priority",
+    type=int,
+    default=None,
+    help="Notebooks with higher priority are run first. Defaults to 0.",
+)
+def mark(filepath, timeout, memory_limit, priority):
+    """registers a notebook for autorun, or changes the settings of a registered notebook"""
     assert os.path.exists(filepath)
-    df = get_or_create_metadata()
-    assert not filepath in df["filename"].values, "Already registered"
-    df = df.append(pd.DataFrame({"filename": filepath}, index=[-1]))
-    write_metadata(df)
+    if memory_limit is not None:
+        try:
+            parse_size(memory_limit)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--memory-limit")
+    settings = dict(timeout=timeout, memory_limit=memory_limit, priority=priority)
+    with edit_config(path_to_config_file()) as config:
+        if all(value is None for value in settings.values()):
+            assert filepath not in config.notebooks, "Already registered"
+        config.add(
+            filepath,
+            **{key: value for key, value in settings.items() if value is not None},
+        )
     print(
         "Registered notebook for autorun. Make sure git pre-commit hook is installed by running: summarynb install"
     )
@@ -124,14 +191,95 @@ def mark(filepath):
 @click.argument("filepath")
 def unmark(filepath):
     """deregisters a notebook for autorun"""
-    df = get_or_create_metadata().set_index("filename")
-    # throws exception if filename not in index
-    df = df.drop([filepath], axis=0).reset_index()
-    write_metadata(df)
+    with edit_config(path_to_config_file()) as config:
+        # throws exception if filename not registered
+        config.remove(filepath)
+
+
+def staged_files():
+    """Absolute paths of the files staged for the commit being made, including deleted files."""
+    root = git_root_path()
+    # while a hook runs for `git commit -a` or `git commit <paths>`, git points GIT_INDEX_FILE at the index being committed
+    result = subprocess.run(
+        ["git", "diff", "--cached", "--name-only", "-z"],
+        cwd=root,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    assert result.returncode == 0, "not a git repo!"
+    return [os.path.join(root, fname) for fname in result.stdout.split("\0") if fname]
+
+
+def notebooks_affected_by(fnames, paths):
+    """Notebooks among [fnames] that are among [paths] themselves, or that read one of [paths]:
+    input files are detected from each notebook's code, and recorded by its last run (see `summarynb deps`).
+    """
+    graph = dependency_graph(fnames, DependencyStore(path_to_deps_file()).inputs)
+    graph = {os.path.realpath(path): notebooks for path, notebooks in graph.items()}
+    affected = {
+        notebook for path in paths for notebook in graph.get(os.path.realpath(path), [])
+    }
+    return [fname for fname in fnames if fname in affected]
+
+
+def run_status(result):
+    if result.returncode == 0:
+        return "ok"
+    return "timed out" if result.timed_out else "failed"
+
+
+def execute_notebook(
+    fname, kernel_pool=None, env=None, timeout=None, memory_limit=None
+):
+    """Execute a notebook in place with a kernel from [kernel_pool], or with a jupyter nbconvert subprocess if no pool is given.
+    [env] holds extra environment variables for the notebook. Execution is stopped after [timeout] seconds,
+    and limited to [memory_limit] bytes of memory. Returns an ExecutionResult."""
+    if kernel_pool is None:
+        return execute_with_nbconvert(
+            fname, env=env, timeout=timeout, memory_limit=memory_limit
+        )
+    return execute_with_kernel(
+        fname, kernel_pool, env=env, timeout=timeout, memory_limit=memory_limit
+    )
 
 
 @main.command()
-def run():
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of notebooks to execute in parallel. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Execute all notebooks, even those unchanged since their last successful run.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["kernel", "nbconvert"]),
+    default="kernel",
+    show_default=True,
+    help="Execute notebooks in kernels driven from this process, or in separate jupyter nbconvert processes.",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Stop notebooks that run for longer than this many seconds, unless set per notebook. Defaults to no timeout.",
+)
+@click.option(
+    "--memory-limit",
+    default=None,
+    help="Limit the memory of each notebook, e.g. 2G, unless set per notebook. Defaults to no limit.",
+)
+@click.option(
+    "--staged",
+    is_flag=True,
+    help="Only execute notebooks that are staged for commit, or whose input files are. Used by the pre-commit hook.",
+)
+def run(jobs, force, engine, timeout, memory_limit, staged):
     """
     Execute notebooks in autorun list.
 
@@ -145,27 +293,446 @@ def run():
                 --ClearMetadataPreprocessor.clear_cell_metadata=True \
                     --ClearMetadataPreprocessor.clear_notebook_metadata=True \
                         --ClearMetadataPreprocessor.preserve_nb_metadata_mask='()';
+
+    By default, notebooks are executed in-process with nbclient, using kernels that are started ahead of time.
+    Pass --engine nbconvert to shell out to the command above instead.
+
+    Notebooks are independent, so they are executed in parallel, up to --jobs at a time.
+    Exits with a non-zero code if any notebook failed.
+
+    Notebooks whose code cells and input files (detected from string literals in the code) are unchanged
+    since their last successful run are skipped, unless --force is given.
+
+    Set a timeout or memory limit (e.g. 2G) for individual notebooks with `summarynb mark NOTEBOOK --timeout 600 --memory-limit 2G`,
+    or for all notebooks with --timeout and --memory-limit. Memory limits cap the address space of the process executing
+    the notebook, so leave headroom. Durations and peak memory use are reported slowest first,
+    and appended to .summarynb.history: see `summarynb history`.
+
+    With --staged, as in the pre-commit hook installed by `summarynb install`, only notebooks that are staged for commit
+    or whose input files are staged (detected as above, or recorded by `summarynb deps`) are executed.
+    All notebooks are executed if .summarynb.config itself is staged,
+    or if its "options" set "run_all_on_commit" to true.
     """
-    df = get_or_create_metadata()
+    config = get_or_create_metadata()
+    fnames = config.filenames()
+    if staged and not config.options.get("run_all_on_commit", False):
+        staged_paths = staged_files()
+        config_path = os.path.realpath(path_to_config_file())
+        if config_path not in {os.path.realpath(path) for path in staged_paths}:
+            affected = notebooks_affected_by(fnames, staged_paths)
+            if not affected:
+                print("No staged files affect summary notebooks, skipping them")
+                return
+            print(
+                f"{len(affected)} of {len(fnames)} summary notebooks are affected by staged files"
+            )
+            fnames = affected
     print("Running summary notebooks. Skip this with --no-verify")
-    for fname in df["filename"].values:
-        print(fname)
-        subprocess.run(
-            [
-                "jupyter",
-                "nbconvert",
-                "--to",
-                "notebook",
-                "--execute",
+    try:
+        failures = run_notebooks(
+            fnames,
+            jobs=jobs,
+            force=force,
+            engine=engine,
+            settings=config.notebooks,
+            timeout=timeout,
+            memory_limit=memory_limit,
+        )
+    except ValueError as e:
+        # invalid memory limit
+        raise click.UsageError(str(e))
+    if failures:
+        sys.exit(1)
+
+
+def run_notebooks(
+    fnames,
+    jobs=None,
+    force=False,
+    engine="kernel",
+    settings=None,
+    timeout=None,
+    memory_limit=None,
+):
+    """Execute notebooks in parallel, up to [jobs] at a time, skipping those unchanged since their last successful run
+    unless [force] is set. See run().
+    [settings] may override the [timeout] and [memory_limit] of individual notebooks: {filename: {"timeout": seconds, "memory_limit": "2G"}}.
+    Returns the notebooks that failed, in the order given.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    settings = settings or {}
+    limits = {}
+    for fname in fnames:
+        notebook_timeout = settings.get(fname, {}).get("timeout", timeout)
+        notebook_memory_limit = settings.get(fname, {}).get(
+            "memory_limit", memory_limit
+        )
+        limits[fname] = {
+            "timeout": float(notebook_timeout) if notebook_timeout else None,
+            "memory_limit": parse_size(notebook_memory_limit)
+            if notebook_memory_limit
+            else None,
+        }
+
+    run_cache = RunCache(path_to_run_cache())
+    deps_store = DependencyStore(path_to_deps_file())
+
+    def compute_key(fname):
+        try:
+            return run_cache.compute_key(fname, deps_store.inputs(fname))
+        except (OSError, ValueError):
+            # missing or unreadable notebook: let execution report the error
+            return None
+
+    cache_keys = {}
+    to_execute = []
+    for fname in fnames:
+        cache_keys[fname] = compute_key(fname)
+        if (
+            not force
+            and cache_keys[fname] is not None
+            and run_cache.is_fresh(fname, cache_keys[fname])
+        ):
+            print_prefixed(fname, "unchanged since last run, skipping")
+        else:
+            to_execute.append(fname)
+
+    kernel_pool = None
+    if engine == "kernel" and to_execute:
+        kernel_pool = KernelPool(
+            size=min(jobs, len(to_execute)), expected=len(to_execute)
+        )
+
+    def timed_execute_notebook(fname, **kwargs):
+        start = time.perf_counter()
+        result = execute_notebook(fname, **kwargs)
+        return result, time.perf_counter() - start
+
+    failures = []
+    timings = []
+    started = datetime.now().isoformat(timespec="seconds")
+    # loaders record the files each notebook reads into its own deps file
+    deps_dir = tempfile.TemporaryDirectory(prefix="summarynb-deps-")
+    deps_fnames = {
+        fname: os.path.join(deps_dir.name, f"{i}.deps")
+        for i, fname in enumerate(to_execute)
+    }
+    with deps_dir, ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                timed_execute_notebook,
                 fname,
-                "--inplace",
-                "--ClearMetadataPreprocessor.enabled=True",
-                "--ClearMetadataPreprocessor.clear_cell_metadata=True",
-                "--ClearMetadataPreprocessor.clear_notebook_metadata=True",
-                "--ClearMetadataPreprocessor.preserve_nb_metadata_mask=()",
+                kernel_pool=kernel_pool,
+                env={DEPS_FILE_ENV: deps_fnames[fname]},
+                **limits[fname],
+            ): fname
+            for fname in to_execute
+        }
+        for future in as_completed(futures):
+            fname = futures[future]
+            try:
+                result, seconds = future.result()
+            except Exception as e:
+                # e.g. jupyter is not installed
+                print_prefixed(fname, f"failed: {e}")
+                result, seconds = ExecutionResult(-1), None
+            if seconds is not None:
+                timings.append(
+                    RunRecord(
+                        notebook=fname,
+                        started=started,
+                        seconds=round(seconds, 3),
+                        peak_rss=result.peak_rss,
+                        status=run_status(result),
+                        engine=engine,
+                    )
+                )
+            if result.returncode != 0:
+                failures.append(fname)
+                continue
+            previous_inputs = set(deps_store.inputs(fname))
+            deps_store.record(
+                fname, read_accesses(deps_fnames[fname]), run_cache.hash_file
+            )
+            if set(deps_store.inputs(fname)) != previous_inputs:
+                # the key was computed from the inputs recorded by the previous run
+                cache_keys[fname] = compute_key(fname)
+            if cache_keys[fname] is not None:
+                run_cache.record(fname, cache_keys[fname])
+    if kernel_pool is not None:
+        kernel_pool.shutdown()
+    run_cache.save()
+    deps_store.save()
+    print()
+
+    if timings:
+        append_runs(path_to_history_file(), timings)
+        print("Slowest notebooks first:")
+        width = max(len(record.notebook) for record in timings)
+        for record in sorted(timings, key=lambda record: -record.seconds):
+            status = "" if record.status == "ok" else f"  {record.status}"
+            print(
+                f"  {record.notebook:<{width}}  {record.seconds:8.1f}s  {format_size(record.peak_rss):>10}{status}"
+            )
+        print()
+
+    # report in the order given, not completion order
+    failures = [fname for fname in fnames if fname in failures]
+    if failures:
+        print(f"{len(failures)} of {len(fnames)} notebooks failed:")
+        for fname in failures:
+            print(f"  {fname}")
+    return failures
+
+
+@main.command()
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of notebooks to execute in parallel. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["kernel", "nbconvert"]),
+    default="kernel",
+    show_default=True,
+    help="Execute notebooks in kernels driven from this process, or in separate jupyter nbconvert processes.",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=1.0,
+    show_default=True,
+    help="Seconds to wait for changes to settle before re-running notebooks.",
+)
+@click.option(
+    "--polling",
+    is_flag=True,
+    help="Poll files for changes instead of using filesystem notifications.",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0, min_open=True),
+    default=1.0,
+    show_default=True,
+    help="Seconds between checks for changes when polling.",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Stop notebooks that run for longer than this many seconds, unless set per notebook. Defaults to no timeout.",
+)
+@click.option(
+    "--memory-limit",
+    default=None,
+    help="Limit the memory of each notebook, e.g. 2G, unless set per notebook. Defaults to no limit.",
+)
+def watch(jobs, engine, debounce, polling, poll_interval, timeout, memory_limit):
+    """
+    Keep notebooks in autorun list up to date: re-execute notebooks whenever they or their input files change.
+
+    Input files are detected as in `summarynb run`. Notebooks are first brought up to date,
+    then only the notebooks affected by each change are re-executed, in parallel.
+    Uses filesystem notifications if watchdog is installed (pip install watchdog), and otherwise polls for changes.
+    Timeouts and memory limits apply as in `summarynb run`, so a hung notebook doesn't stall the watcher.
+    Stop with Ctrl-C.
+    """
+    from .watch import watch as watch_notebooks
+
+    if memory_limit is not None:
+        try:
+            parse_size(memory_limit)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+
+    def list_notebooks():
+        return get_or_create_metadata().filenames()
+
+    def run_affected(fnames):
+        # settings are re-read on every run, to pick up `summarynb mark` changes made while watching
+        return run_notebooks(
+            fnames,
+            jobs=jobs,
+            engine=engine,
+            settings=get_or_create_metadata().notebooks,
+            timeout=timeout,
+            memory_limit=memory_limit,
+        )
+
+    print("Watching summary notebooks. Stop with Ctrl-C")
+    try:
+        watch_notebooks(
+            list_notebooks,
+            run_affected,
+            recorded_inputs=lambda: DependencyStore(path_to_deps_file()).inputs,
+            extra_paths=[path_to_config_file()],
+            debounce=debounce,
+            polling=polling,
+            poll_interval=poll_interval,
+        )
+    except KeyboardInterrupt:
+        print("stopped")
+
+
+@main.command()
+@click.argument("notebooks", nargs=-1)
+@click.option(
+    "--window",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Compare the latest run against the median of this many runs before it.",
+)
+def history(notebooks, window):
+    """
+    Show how long notebooks took to run and how much memory they used, to spot notebooks that are getting slower.
+
+    Reads the durations recorded by `summarynb run` in .summarynb.history. Defaults to all notebooks with recorded runs.
+    """
+    records = read_runs(path_to_history_file())
+    if notebooks:
+        records = [record for record in records if record.notebook in notebooks]
+    trends = summarize(records, window=window)
+    if not trends:
+        print("no recorded runs")
+        return
+
+    def format_seconds(seconds):
+        return "-" if seconds is None else f"{seconds:.1f}s"
+
+    rows = [["notebook", "runs", "failed", "latest", "median", "change", "peak memory"]]
+    for trend in trends:
+        change = "-"
+        if trend.latest_seconds is not None and trend.median_seconds:
+            change = f"{trend.latest_seconds / trend.median_seconds - 1:+.0%}"
+        rows.append(
+            [
+                trend.notebook,
+                str(trend.runs),
+                str(trend.failures),
+                format_seconds(trend.latest_seconds),
+                format_seconds(trend.median_seconds),
+                change,
+                format_size(trend.latest_peak_rss),
             ]
         )
-        print()
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print(
+            "  ".join(
+                # left-align notebook names, right-align numbers
+                cell.ljust(width) if i == 0 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            )
+        )
+
+
+@main.command()
+@click.argument("notebooks", nargs=-1)
+@click.option(
+    "--dependents",
+    "dependents_of",
+    type=click.Path(),
+    default=None,
+    help="List the notebooks that read this file, instead of the files that notebooks read.",
+)
+def deps(notebooks, dependents_of):
+    """
+    Show the input files that notebooks read through image(), csv(), textfile() etc. during their last `summarynb run`.
+
+    Defaults to all notebooks in autorun list. Files that changed or were deleted since are marked.
+    The record is kept in .summarynb.deps, next to .summarynb.config.
+    """
+    deps_store = DependencyStore(path_to_deps_file())
+    if dependents_of is not None:
+        for notebook in deps_store.dependents(dependents_of):
+            print(os.path.relpath(os.path.join(deps_store.root, notebook)))
+        return
+
+    if not notebooks:
+        notebooks = get_or_create_metadata().filenames()
+    for notebook in notebooks:
+        inputs = deps_store.inputs(notebook)
+        print(notebook if inputs else f"{notebook} (no recorded inputs)")
+        for path, sha256 in sorted(inputs.items()):
+            if not os.path.isfile(path):
+                status = " (missing)"
+            elif hash_file(path) != sha256:
+                status = " (changed)"
+            else:
+                status = ""
+            print(f"  {os.path.relpath(path)}{status}")
+
+
+@main.command()
+@click.argument("specs", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--output-dir",
+    "-o",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Write reports relative to this directory, instead of relative to their spec file.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of cells to load and render at once. Defaults to the number of CPUs.",
+)
+def render(specs, output_dir, workers):
+    """
+    Render reports described by JSON or YAML spec files to static HTML, without executing notebooks.
+
+    A spec lists each report's output file, entries and headers, as passed to show():
+
+    \b
+        defaults:
+          max_width: 400
+        reports:
+          - output: run_1.html
+            title: Run 1
+            headers: [Plot, Table]
+            entries: [run_1.png, {indexed_csv: run_1.csv}]
+
+    All reports are rendered in this process, so files shared between reports are only read once.
+    Cells that fail to render show their error. Exits with a non-zero code if any spec could not be rendered.
+    """
+    from .report import load_spec, render_report
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    start = time.perf_counter()
+    n_reports = 0
+    failures = []
+    for spec in specs:
+        try:
+            reports = load_spec(spec)
+        except (OSError, ValueError, ImportError) as e:
+            print_prefixed(spec, f"failed: {e}")
+            failures.append(spec)
+            continue
+        for report in reports:
+            try:
+                output = render_report(
+                    report,
+                    base_dir=os.path.dirname(os.path.abspath(spec)),
+                    output_dir=output_dir,
+                    workers=workers,
+                )
+            except Exception as e:
+                print_prefixed(spec, f"{report['output']} failed: {e}")
+                failures.append(spec)
+                continue
+            print_prefixed(spec, f"wrote {os.path.relpath(output)}")
+            n_reports += 1
+    print(f"Rendered {n_reports} reports in {time.perf_counter() - start:.1f}s")
+    if failures:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+"""The autorun list in .summarynb.config: notebooks for `summarynb run` to execute, with per-notebook settings.
+
+Stored as JSON, so reading it needs nothing beyond the standard library. Lists written by earlier versions as CSV
+are read transparently and converted to JSON the next time the list is changed.
+"""
+
+import contextlib
+import csv
+import io
+import json
+
+from .storage import atomic_write, file_lock
+
+CONFIG_VERSION = 1
+
+# known per-notebook settings, and how to convert values read from CSV
+SETTINGS = {"timeout": float, "memory_limit": str, "priority": int}
+
+
+def _from_csv(text):
+    # the autorun list used to be written by pandas: a filename column, plus optional columns like timeout
+    notebooks = {}
+    for row in csv.DictReader(io.StringIO(text)):
+        filename = row.pop("filename", None)
+        if not filename or filename in notebooks:
+            continue
+        settings = {}
+        for key, value in row.items():
+            if key is None or value is None or value == "":
+                continue
+            convert = SETTINGS.get(key, str)
+            # pandas writes integer columns with missing values as floats, e.g. 600.0
+            settings[key] = convert(float(value)) if convert is int else convert(value)
+        notebooks[filename] = settings
+    return notebooks
+
+
+class NotebookConfig:
+    """Notebooks registered for autorun, in registration order, with their settings: {filename: {setting: value}}.
+
+    Settings include "timeout" (seconds), "memory_limit" (e.g. "2G") and "priority" (higher runs first).
+    [options] holds settings for all notebooks, such as "run_all_on_commit": see `summarynb run --staged`.
+    """
+
+    def __init__(self, fname):
+        self.fname = fname
+        try:
+            with open(fname, "r") as f:
+                text = f.read()
+        except FileNotFoundError:
+            text = ""
+        if text.lstrip().startswith("{"):
+            # a corrupt list raises, rather than silently unregistering every notebook
+            data = json.loads(text)
+        elif text.strip():
+            data = {"notebooks": _from_csv(text)}
+        else:
+            data = {}
+        self.notebooks = data.get("notebooks", {})
+        self.options = data.get("options", {})
+
+    def filenames(self):
+        """Registered notebooks in the order to run them: by descending priority, then in registration order."""
+        return sorted(
+            self.notebooks,
+            key=lambda filename: -self.notebooks[filename].get("priority", 0),
+        )
+
+    def settings(self, filename):
+        return self.notebooks.get(filename, {})
+
+    def add(self, filename, **settings):
+        """Register [filename], or update its settings if already registered. Settings given as None are removed."""
+        current = self.notebooks.setdefault(filename, {})
+        for key, value in settings.items():
+            if value is None:
+                current.pop(key, None)
+            else:
+                current[key] = value
+
+    def remove(self, filename):
+        """Deregister [filename]. Raises KeyError if it isn't registered."""
+        del self.notebooks[filename]
+
+    def save(self):
+        data = {"version": CONFIG_VERSION, "notebooks": self.notebooks}
+        if self.options:
+            data["options"] = self.options
+        with atomic_write(self.fname) as w:
+            json.dump(data, w, indent=2)
+            w.write("\n")
+
+
+@contextlib.contextmanager
+def edit_config(fname):
+    """Load the autorun list for changes, and save it on exit. Holds a lock throughout, so concurrent edits aren't lost."""
+    with file_lock(fname):
+        config = NotebookConfig(fname)
+        yield config
+        config.save()
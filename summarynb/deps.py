@@ -0,0 +1,97 @@
+"""Record which files each notebook reads through summarynb's loaders while `summarynb run` executes it."""
+
+import json
+import os
+import threading
+
+from .storage import atomic_write, file_lock
+
+# Set by `summarynb run` for each notebook it executes: loaders append the paths they access to this file.
+DEPS_FILE_ENV = "SUMMARYNB_DEPS_FILE"
+
+_record_lock = threading.Lock()
+
+
+def record_access(fname):
+    """Note that [fname] was read, if running under `summarynb run`. Called by image(), csv(), textfile() and friends."""
+    deps_fname = os.environ.get(DEPS_FILE_ENV)
+    if not deps_fname or not isinstance(fname, (str, os.PathLike)):
+        return
+    with _record_lock:
+        # one short write per line in append mode, so lines from concurrent writers don't interleave
+        with open(deps_fname, "a") as w:
+            w.write(os.path.abspath(fname) + "\n")
+
+
+def read_accesses(deps_fname):
+    """Paths recorded by record_access() into [deps_fname], de-duplicated and sorted."""
+    try:
+        with open(deps_fname, "r") as f:
+            return sorted({line.rstrip("\n") for line in f if line.strip()})
+    except OSError:
+        # the notebook never called a loader
+        return []
+
+
+class DependencyStore:
+    """Persistent record of the input files each notebook read during its last successful run, with their sha256 hashes.
+
+    Paths are stored relative to the store's directory (the git root), so the record can be committed alongside .summarynb.config.
+    Saving merges in notebooks recorded by concurrent runs, e.g. `summarynb watch` and the pre-commit hook.
+    """
+
+    def __init__(self, fname):
+        self.fname = fname
+        self.root = os.path.dirname(os.path.abspath(fname))
+        self.notebooks = self._load()
+        # notebooks recorded since loading, which save() writes over the file's current record
+        self._recorded = set()
+
+    def _load(self):
+        try:
+            with open(self.fname, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # missing or corrupt record: start over
+            data = {}
+        return data.get("notebooks", {})
+
+    def _key(self, path):
+        return os.path.relpath(os.path.abspath(path), self.root)
+
+    def _path(self, key):
+        return os.path.normpath(os.path.join(self.root, key))
+
+    def inputs(self, notebook):
+        """{absolute path: sha256 at the last run} of the files [notebook] read during its last recorded run."""
+        return {
+            self._path(key): sha256
+            for key, sha256 in self.notebooks.get(self._key(notebook), {}).items()
+        }
+
+    def record(self, notebook, paths, hash_file):
+        """Replace [notebook]'s inputs with [paths], hashed with [hash_file](path). Paths that aren't files are dropped."""
+        notebook_path = os.path.abspath(notebook)
+        self._recorded.add(self._key(notebook))
+        self.notebooks[self._key(notebook)] = {
+            self._key(path): hash_file(path)
+            for path in paths
+            if os.path.isfile(path) and os.path.abspath(path) != notebook_path
+        }
+
+    def dependents(self, path):
+        """Notebooks (relative to the store's directory) that read [path] during their last recorded run."""
+        key = self._key(path)
+        return sorted(
+            notebook for notebook, inputs in self.notebooks.items() if key in inputs
+        )
+
+    def save(self):
+        """Write the notebooks recorded since loading, keeping those other runs recorded in the meantime."""
+        with file_lock(self.fname):
+            notebooks = self._load()
+            notebooks.update({key: self.notebooks[key] for key in self._recorded})
+            with atomic_write(self.fname) as w:
+                json.dump({"notebooks": notebooks}, w, indent=2, sort_keys=True)
+        self.notebooks = notebooks
+        self._recorded = set()
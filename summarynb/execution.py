@@ -0,0 +1,327 @@
+"""Engines that execute summary notebooks in place for `summarynb run`."""
+
+import collections
+import functools
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ExecutionResult = collections.namedtuple(
+    "ExecutionResult", ["returncode", "peak_rss", "timed_out"]
+)
+ExecutionResult.__new__.__defaults__ = (None, False)
+ExecutionResult.__doc__ = """Outcome of executing a notebook: its exit code, the peak resident memory in bytes of the process
+that executed it (None where unavailable), and whether it was stopped for exceeding its timeout."""
+
+# notebooks run concurrently, so serialize writes to the terminal to keep lines intact
+_print_lock = threading.Lock()
+
+
+def print_prefixed(prefix, line):
+    with _print_lock:
+        print(f"[{prefix}] {line.rstrip()}", flush=True)
+
+
+def nbconvert_command(fname):
+    """Build the jupyter nbconvert invocation that executes a notebook in place and strips metadata."""
+    return [
+        "jupyter",
+        "nbconvert",
+        "--to",
+        "notebook",
+        "--execute",
+        fname,
+        "--inplace",
+        "--ClearMetadataPreprocessor.enabled=True",
+        "--ClearMetadataPreprocessor.clear_cell_metadata=True",
+        "--ClearMetadataPreprocessor.clear_notebook_metadata=True",
+        "--ClearMetadataPreprocessor.preserve_nb_metadata_mask=()",
+    ]
+
+
+def _wait(process):
+    """Wait for a subprocess to exit. Returns its exit code and peak resident memory in bytes, or None where unavailable."""
+    if not hasattr(os, "wait4"):
+        return process.wait(), None
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = (
+        -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    )
+    # includes the descendants it waited for, such as the kernel. kilobytes on Linux, bytes on macOS
+    peak_rss = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return process.returncode, peak_rss
+
+
+def execute_with_nbconvert(fname, env=None, timeout=None, memory_limit=None):
+    """Execute a notebook in a jupyter nbconvert subprocess, streaming its output prefixed by the notebook name.
+    [env] holds extra environment variables for the notebook.
+    The subprocess and its kernel are killed after [timeout] seconds, and limited to [memory_limit] bytes of memory each.
+    Returns an ExecutionResult."""
+    limit_memory = None
+    if memory_limit:
+        import resource
+
+        # caps the address space of the subprocess, and of every process it starts, such as the kernel.
+        # bound here, since only a plain call into C is safe between fork and exec in a multithreaded process
+        limit_memory = functools.partial(
+            resource.setrlimit, resource.RLIMIT_AS, (memory_limit, memory_limit)
+        )
+    print_prefixed(fname, "started")
+    process = subprocess.Popen(
+        nbconvert_command(fname),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        env=dict(os.environ, **env) if env else None,
+        preexec_fn=limit_memory,
+        # in its own process group, so that a timeout kills the kernel too
+        start_new_session=timeout is not None,
+    )
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+
+    timer = None
+    if timeout is not None:
+        timer = threading.Timer(timeout, kill)
+        timer.daemon = True
+        timer.start()
+    try:
+        for line in process.stdout:
+            print_prefixed(fname, line)
+        returncode, peak_rss = _wait(process)
+    finally:
+        if timer is not None:
+            timer.cancel()
+    result = ExecutionResult(
+        returncode, peak_rss=peak_rss, timed_out=timed_out.is_set()
+    )
+    if result.timed_out:
+        print_prefixed(fname, "timed out")
+    else:
+        print_prefixed(
+            fname, "finished" if returncode == 0 else f"failed ({returncode})"
+        )
+    return result
+
+
+class KernelPool:
+    """Kernels started ahead of time, so that notebooks don't wait on kernel startup.
+
+    Each kernel executes a single notebook and is then shut down, so notebooks never share state.
+    Whenever a warm kernel is handed out, a replacement starts in the background, until [expected] kernels have been handed out.
+    Only kernels of [kernel_name] are kept warm; notebooks requesting other kernels get a freshly started one.
+    """
+
+    def __init__(self, size, expected=None, kernel_name="python3", timeout=60):
+        from jupyter_client.kernelspec import KernelSpecManager
+
+        self.kernel_name = kernel_name
+        self.timeout = timeout
+        # warm kernels are started in the kernel's default working directory and moved with os.chdir once assigned,
+        # which only works for Python kernels
+        try:
+            language = KernelSpecManager().get_kernel_spec(kernel_name).language
+        except Exception:
+            # kernel not installed; each notebook will report the error when it tries to start one
+            language = None
+        self.size = size if language == "python" else 0
+        self._remaining = expected
+        self._lock = threading.Lock()
+        self._starter = ThreadPoolExecutor(max_workers=max(self.size, 1))
+        # futures of kernel managers, in the order they were started
+        self._warm = queue.Queue()
+        for _ in range(self.size if expected is None else min(self.size, expected)):
+            self._warm.put(self._starter.submit(self._start_kernel, kernel_name))
+
+    def _start_kernel(self, kernel_name, cwd=None, env=None):
+        from jupyter_client.manager import KernelManager
+
+        km = KernelManager(kernel_name=kernel_name)
+        if env:
+            # replaces the kernel's whole environment
+            km.start_kernel(cwd=cwd, env=dict(os.environ, **env))
+        else:
+            km.start_kernel(cwd=cwd)
+        kc = km.client()
+        kc.start_channels()
+        try:
+            kc.wait_for_ready(timeout=self.timeout)
+        finally:
+            kc.stop_channels()
+        return km
+
+    def _prepare(self, km, cwd, env, memory_limit=None):
+        # move a warm kernel into the notebook's directory and environment
+        env = dict(env or {})
+        code = (
+            f"__import__('os').chdir({cwd!r}); __import__('os').environ.update({env!r})"
+        )
+        if memory_limit:
+            # a process may lower its own limits
+            code += f"; __import__('resource').setrlimit(__import__('resource').RLIMIT_AS, ({memory_limit!r}, {memory_limit!r}))"
+        kc = km.client()
+        kc.start_channels()
+        try:
+            reply = kc.execute_interactive(
+                code,
+                silent=True,
+                store_history=False,
+                timeout=self.timeout,
+            )
+        finally:
+            kc.stop_channels()
+        if reply["content"]["status"] != "ok":
+            raise RuntimeError(f"Could not prepare kernel to run in {cwd}")
+
+    def acquire(self, kernel_name, cwd, env=None, memory_limit=None):
+        """Get a started kernel manager whose kernel runs in [cwd], with extra environment variables [env],
+        limited to [memory_limit] bytes of memory (Python kernels only). Caller must release() it.
+        """
+        if kernel_name != self.kernel_name:
+            return self._start_cold_kernel(kernel_name, cwd, env, memory_limit)
+        with self._lock:
+            try:
+                future = self._warm.get_nowait()
+            except queue.Empty:
+                future = None
+            if self._remaining is not None:
+                self._remaining -= 1
+            # keep enough kernels warm for the notebooks still to come
+            target = (
+                self.size
+                if self._remaining is None
+                else min(self.size, self._remaining)
+            )
+            if self._warm.qsize() < target:
+                self._warm.put(self._starter.submit(self._start_kernel, kernel_name))
+        if future is None:
+            return self._start_cold_kernel(kernel_name, cwd, env, memory_limit)
+        km = future.result()
+        self._prepare(km, cwd, env, memory_limit)
+        return km
+
+    def _start_cold_kernel(self, kernel_name, cwd, env, memory_limit):
+        km = self._start_kernel(kernel_name, cwd=cwd, env=env)
+        if memory_limit:
+            try:
+                self._prepare(km, cwd, env, memory_limit)
+            except Exception:
+                self.release(km)
+                raise
+        return km
+
+    def release(self, km):
+        km.shutdown_kernel(now=True)
+
+    def shutdown(self):
+        """Shut down all warm kernels that were never handed out."""
+        while True:
+            try:
+                future = self._warm.get_nowait()
+            except queue.Empty:
+                break
+            if future.cancel():
+                continue
+            try:
+                self.release(future.result())
+            except Exception:
+                # kernel failed to start; nothing to shut down
+                pass
+        self._starter.shutdown(wait=True)
+
+
+def _kernel_peak_rss(km):
+    """Peak resident memory of a kernel in bytes, from Linux process accounting. None where unavailable."""
+    provisioner = getattr(km, "provisioner", None)
+    pid = getattr(provisioner, "pid", None)
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    # reported in kB
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def execute_with_kernel(fname, kernel_pool, env=None, timeout=None, memory_limit=None):
+    """Execute a notebook in place with nbclient, in a kernel from [kernel_pool], then strip metadata.
+    [env] holds extra environment variables for the notebook.
+    Execution is stopped after [timeout] seconds, and the kernel is limited to [memory_limit] bytes of memory.
+    Equivalent to execute_with_nbconvert, without paying for a new Python process and kernel startup per notebook.
+    Returns an ExecutionResult, with return code 0 on success and 1 on failure. The notebook is not written if execution fails.
+    """
+    import nbformat
+    from nbclient import NotebookClient
+    from nbclient.exceptions import CellTimeoutError
+    from nbconvert.preprocessors import ClearMetadataPreprocessor
+
+    print_prefixed(fname, "started")
+    timed_out = False
+    peak_rss = None
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    try:
+        nb = nbformat.read(fname, as_version=4)
+        cwd = os.path.dirname(os.path.abspath(fname))
+        kernel_name = (
+            nb.metadata.get("kernelspec", {}).get("name") or kernel_pool.kernel_name
+        )
+        km = kernel_pool.acquire(kernel_name, cwd, env=env, memory_limit=memory_limit)
+        # nbclient polls the kernel from an event loop: a blocking client would stall it while waiting for output,
+        # and with it cell timeouts and detection of a dead kernel
+        km.client_class = "jupyter_client.asynchronous.AsyncKernelClient"
+        try:
+            client = NotebookClient(
+                nb,
+                km=km,
+                kernel_name=kernel_name,
+                resources={"metadata": {"path": cwd}},
+                on_cell_executed=lambda cell, cell_index, **kwargs: print_prefixed(
+                    fname, f"executed cell {cell_index + 1} of {len(nb.cells)}"
+                ),
+                # each cell may take whatever remains of the notebook's time budget
+                timeout_func=(lambda cell: max(deadline - time.monotonic(), 0.001))
+                if timeout is not None
+                else None,
+            )
+            try:
+                client.execute()
+            except CellTimeoutError:
+                timed_out = True
+                raise
+            finally:
+                if client.kc is not None:
+                    client.kc.stop_channels()
+        finally:
+            peak_rss = _kernel_peak_rss(km)
+            kernel_pool.release(km)
+        nb, _ = ClearMetadataPreprocessor(
+            enabled=True,
+            clear_cell_metadata=True,
+            clear_notebook_metadata=True,
+            preserve_nb_metadata_mask=set(),
+        ).preprocess(nb, {})
+        nbformat.write(nb, fname)
+    except Exception as e:
+        result = ExecutionResult(1, peak_rss=peak_rss, timed_out=timed_out)
+        if not result.timed_out:
+            for line in str(e).splitlines():
+                print_prefixed(fname, line)
+        print_prefixed(fname, "timed out" if result.timed_out else "failed")
+        return result
+    print_prefixed(fname, "finished")
+    return ExecutionResult(0, peak_rss=peak_rss)
@@ -0,0 +1,100 @@
+"""Durations and memory use of notebook runs by `summarynb run`, kept to spot notebooks that are getting slower over time."""
+
+import collections
+import json
+import re
+import statistics
+
+RunRecord = collections.namedtuple(
+    "RunRecord", ["notebook", "started", "seconds", "peak_rss", "status", "engine"]
+)
+RunRecord.__doc__ = """One execution of a notebook: when it started (ISO 8601), its wall time, the peak resident memory in bytes
+of the process that executed it (None where unavailable), and its status: "ok", "failed", or "timed out"."""
+
+_size_units = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+_size = re.compile(r"^\s*(?P<number>\d+(\.\d+)?)\s*(?P<unit>[KMGT]?)i?B?\s*$", re.I)
+
+
+def parse_size(size):
+    """Parse a size in bytes such as 512M, 2G, or 1.5GB (binary units). Plain numbers are bytes."""
+    if isinstance(size, (int, float)):
+        return int(size)
+    match = _size.match(size)
+    if match is None:
+        raise ValueError(f"Invalid size {size!r}: expected e.g. 512M or 2G")
+    return int(float(match.group("number")) * _size_units[match.group("unit").upper()])
+
+
+def format_size(size):
+    if size is None:
+        return "-"
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            break
+        size /= 1024
+    else:
+        unit = "TB"
+    return f"{size:.1f} {unit}"
+
+
+def append_runs(fname, records):
+    """Append run records to the history file, one JSON object per line."""
+    with open(fname, "a") as w:
+        for record in records:
+            w.write(json.dumps(record._asdict()) + "\n")
+
+
+def read_runs(fname):
+    """All run records in the history file, oldest first."""
+    records = []
+    try:
+        with open(fname, "r") as f:
+            for line in f:
+                try:
+                    records.append(RunRecord(**json.loads(line)))
+                except (ValueError, TypeError):
+                    # skip a line cut short by an interrupted write
+                    continue
+    except OSError:
+        # no history yet
+        pass
+    return records
+
+
+NotebookTrend = collections.namedtuple(
+    "NotebookTrend",
+    [
+        "notebook",
+        "runs",
+        "failures",
+        "latest_seconds",
+        "median_seconds",
+        "latest_peak_rss",
+    ],
+)
+
+
+def summarize(records, window=10):
+    """Per-notebook trends, in order of first run: number of runs and failures, the latest successful run's duration and peak memory,
+    and the median duration of the [window] successful runs before it (None without earlier runs).
+    """
+    by_notebook = collections.OrderedDict()
+    for record in records:
+        by_notebook.setdefault(record.notebook, []).append(record)
+
+    trends = []
+    for notebook, runs in by_notebook.items():
+        ok_runs = [run for run in runs if run.status == "ok"]
+        latest = ok_runs[-1] if ok_runs else None
+        previous = [run.seconds for run in ok_runs[-window - 1 : -1]]
+        trends.append(
+            NotebookTrend(
+                notebook=notebook,
+                runs=len(runs),
+                failures=len(runs) - len(ok_runs),
+                latest_seconds=latest.seconds if latest else None,
+                median_seconds=statistics.median(previous) if previous else None,
+                latest_peak_rss=latest.peak_rss if latest else None,
+            )
+        )
+    return trends
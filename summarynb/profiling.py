@@ -0,0 +1,223 @@
+"""Opt-in timing instrumentation for show(), to find out which cells of a slow summary are expensive, and why."""
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+
+CellProfile = collections.namedtuple(
+    "CellProfile",
+    [
+        "show_number",
+        "row",
+        "column",
+        "entry",
+        "start",
+        "load_seconds",
+        "render_seconds",
+        "bytes_read",
+        "html_bytes",
+        "thread_id",
+    ],
+)
+CellProfile.__doc__ = """Timings of one cell.
+Loading resolves the entry to a template function, which reads the file for tables and text.
+Rendering calls the template to produce HTML. bytes_read counts all bytes read by the thread during both,
+or the size of the entry's file where per-thread I/O counters are unavailable (non-Linux); cache hits read nothing."""
+
+DisplayProfile = collections.namedtuple(
+    "DisplayProfile",
+    ["show_number", "start", "layout_seconds", "display_seconds", "html_bytes"],
+)
+DisplayProfile.__doc__ = """Timings of one show() call: laying out the whole grid, and sending its HTML to the front-end."""
+
+
+def bytes_read_by_current_thread():
+    """Bytes read by the calling thread so far, from Linux per-thread I/O accounting. None where unavailable."""
+    try:
+        with open("/proc/thread-self/io", "r") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _entry_name(entry):
+    if isinstance(entry, str):
+        return entry
+    return getattr(entry, "__qualname__", type(entry).__name__)
+
+
+class Profiler:
+    """Collects timings of every cell rendered by show() while active. See profile()."""
+
+    def __init__(self):
+        self.cells = []
+        self.displays = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._show_count = 0
+
+    def next_show_number(self):
+        with self._lock:
+            self._show_count += 1
+            return self._show_count
+
+    def time_cell(self, show_number, row, column, entry, load, render):
+        """Call load() to get a template, then render(template) to get HTML, recording timings. Returns the HTML."""
+        bytes_before = bytes_read_by_current_thread()
+        start = time.perf_counter()
+        template = load()
+        loaded = time.perf_counter()
+        html = render(template)
+        rendered = time.perf_counter()
+        bytes_after = bytes_read_by_current_thread()
+
+        if bytes_before is not None and bytes_after is not None:
+            bytes_read = bytes_after - bytes_before
+        elif isinstance(entry, str) and os.path.isfile(entry):
+            bytes_read = os.path.getsize(entry)
+        else:
+            bytes_read = None
+
+        cell = CellProfile(
+            show_number=show_number,
+            row=row,
+            column=column,
+            entry=_entry_name(entry),
+            start=start - self._origin,
+            load_seconds=loaded - start,
+            render_seconds=rendered - loaded,
+            bytes_read=bytes_read,
+            html_bytes=len(html.encode("utf-8")),
+            thread_id=threading.get_ident(),
+        )
+        with self._lock:
+            self.cells.append(cell)
+        return html
+
+    def record_display(self, show_number, start, layout_seconds, display_seconds, html):
+        with self._lock:
+            self.displays.append(
+                DisplayProfile(
+                    show_number=show_number,
+                    start=start - self._origin,
+                    layout_seconds=layout_seconds,
+                    display_seconds=display_seconds,
+                    html_bytes=len(html.encode("utf-8")),
+                )
+            )
+
+    def summary(self):
+        """Per-cell timings as a dataframe, slowest cells first.
+
+        :rtype: pandas.DataFrame
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(self.cells, columns=CellProfile._fields).drop(
+            columns=["start", "thread_id"]
+        )
+        df["total_seconds"] = df["load_seconds"] + df["render_seconds"]
+        return df.sort_values("total_seconds", ascending=False).reset_index(drop=True)
+
+    def to_dict(self):
+        return {
+            "cells": [cell._asdict() for cell in self.cells],
+            "displays": [display._asdict() for display in self.displays],
+        }
+
+    def to_json(self, fname):
+        """Export all timings to a JSON file."""
+        with open(fname, "w") as w:
+            json.dump(self.to_dict(), w, indent=2)
+
+    def to_chrome_trace(self, fname):
+        """Export timings in Chrome's trace event format. Open the file in chrome://tracing or https://ui.perfetto.dev
+        to see when each cell loaded and rendered, on which thread."""
+        pid = os.getpid()
+        events = []
+
+        def add_event(name, category, start, duration, tid, args):
+            events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    # microseconds
+                    "ts": start * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+
+        for cell in self.cells:
+            args = {
+                "show": cell.show_number,
+                "row": cell.row,
+                "column": cell.column,
+                "bytes_read": cell.bytes_read,
+                "html_bytes": cell.html_bytes,
+            }
+            add_event(
+                cell.entry, "load", cell.start, cell.load_seconds, cell.thread_id, args
+            )
+            add_event(
+                cell.entry,
+                "render",
+                cell.start + cell.load_seconds,
+                cell.render_seconds,
+                cell.thread_id,
+                args,
+            )
+        for display in self.displays:
+            args = {"show": display.show_number, "html_bytes": display.html_bytes}
+            add_event(
+                f"show #{display.show_number} layout",
+                "layout",
+                display.start,
+                display.layout_seconds,
+                "show",
+                args,
+            )
+            add_event(
+                f"show #{display.show_number} display",
+                "display",
+                display.start + display.layout_seconds,
+                display.display_seconds,
+                "show",
+                args,
+            )
+        with open(fname, "w") as w:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, w)
+
+
+_active_profilers = []
+
+
+def active_profiler():
+    """The innermost profiler activated by profile(), or None."""
+    return _active_profilers[-1] if _active_profilers else None
+
+
+@contextlib.contextmanager
+def profile():
+    """Record timings of every show() call within this block.
+
+    Usage:
+        with summarynb.profile() as profiler:
+            show(...)
+        profiler.summary()
+        profiler.to_chrome_trace("trace.json")
+    """
+    profiler = Profiler()
+    _active_profilers.append(profiler)
+    try:
+        yield profiler
+    finally:
+        _active_profilers.remove(profiler)
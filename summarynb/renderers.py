@@ -0,0 +1,176 @@
+"""Registry of the renderers that show() picks for files: by extension, by MIME type, or by sniffing the file's first bytes."""
+
+import collections
+import inspect
+import mimetypes
+import os
+import warnings
+
+Renderer = collections.namedtuple(
+    "Renderer",
+    ["name", "function", "extensions", "mime_types", "magic", "options", "parameters"],
+)
+Renderer.__doc__ = """A function that takes a file name and returns a template function, with the files it handles:
+[extensions] (lowercase, with the leading dot; may be compound, like ".csv.gz"), [mime_types] (exact, or "type/*"),
+and [magic] byte signatures as (offset, bytes). [options] are default keyword arguments, including cost limits.
+[parameters] are the keyword arguments [function] accepts by name."""
+
+
+def _named_parameters(function):
+    try:
+        signature = inspect.signature(function)
+    except (TypeError, ValueError):
+        return frozenset()
+    return frozenset(
+        name
+        for name, parameter in signature.parameters.items()
+        if parameter.kind
+        in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+    )
+
+
+class RendererRegistry:
+    """Renderers for files, looked up through tables rebuilt whenever a renderer is registered.
+
+    Files are matched by extension first (longest compound extension first), then by the MIME type guessed from their name,
+    then by their first bytes. Files that match nothing are shown by the [fallback] renderer, with a warning.
+    """
+
+    def __init__(self, fallback=None):
+        self.fallback = fallback
+        self._renderers = collections.OrderedDict()
+        self._rebuild()
+
+    def register(
+        self,
+        function,
+        extensions=(),
+        mime_types=(),
+        magic=(),
+        name=None,
+        max_bytes=None,
+        max_rows=None,
+        **options,
+    ):
+        """Register [function](fname, **options) to render files, returning the Renderer.
+
+        [extensions]: e.g. [".h5", ".hdf5"]. [mime_types]: e.g. ["application/x-hdf5"] or ["image/*"].
+        [magic]: signatures at the start of the file, as bytes, or (offset, bytes) for signatures further in.
+        [name] defaults to the function's name. Registering a name again replaces the earlier renderer.
+        Later registrations take precedence for the same extension, MIME type, or signature.
+
+        Cost limits: [max_rows] and [max_bytes] are passed on as defaults if [function] accepts them.
+        Otherwise, files larger than [max_bytes] are refused before [function] is called.
+        Other [options] are passed on to [function] as defaults too, e.g. sep="\\t".
+        """
+        if name is None:
+            name = function.__name__
+        if max_rows is not None:
+            options["max_rows"] = max_rows
+        if max_bytes is not None:
+            options["max_bytes"] = max_bytes
+        renderer = Renderer(
+            name=name,
+            function=function,
+            extensions=tuple(extension.lower() for extension in extensions),
+            mime_types=tuple(mime_type.lower() for mime_type in mime_types),
+            magic=tuple(
+                signature if isinstance(signature, tuple) else (0, signature)
+                for signature in magic
+            ),
+            options=options,
+            parameters=_named_parameters(function),
+        )
+        # re-registering moves the renderer to the end, so it takes precedence
+        self._renderers.pop(name, None)
+        self._renderers[name] = renderer
+        self._rebuild()
+        return renderer
+
+    def unregister(self, name):
+        del self._renderers[name]
+        self._rebuild()
+
+    def __getitem__(self, name):
+        return self._renderers[name]
+
+    def __iter__(self):
+        return iter(self._renderers.values())
+
+    def _rebuild(self):
+        self._by_extension = {}
+        self._by_mime_type = {}
+        magic = {}
+        for renderer in self._renderers.values():
+            for extension in renderer.extensions:
+                self._by_extension[extension] = renderer
+            for mime_type in renderer.mime_types:
+                self._by_mime_type[mime_type] = renderer
+            for signature in renderer.magic:
+                magic[signature] = renderer
+        # most specific signatures first
+        self._magic = sorted(magic.items(), key=lambda item: -len(item[0][1]))
+        self._sniff_length = max(
+            [offset + len(signature) for offset, signature in magic] or [0]
+        )
+
+    def lookup(self, fname):
+        """The renderer for [fname], or None if no renderer matches it."""
+        basename = os.path.basename(os.fspath(fname)).lower()
+        # ".csv.gz" before ".gz". A leading dot marks a hidden file, not an extension.
+        parts = basename.lstrip(".").split(".")
+        for i in range(1, len(parts)):
+            renderer = self._by_extension.get("." + ".".join(parts[i:]))
+            if renderer is not None:
+                return renderer
+
+        mime_type, _ = mimetypes.guess_type(basename)
+        if mime_type is not None:
+            renderer = self._by_mime_type.get(mime_type) or self._by_mime_type.get(
+                mime_type.split("/")[0] + "/*"
+            )
+            if renderer is not None:
+                return renderer
+
+        if self._sniff_length and os.path.isfile(fname):
+            with open(fname, "rb") as f:
+                head = f.read(self._sniff_length)
+            for (offset, signature), renderer in self._magic:
+                if head[offset : offset + len(signature)] == signature:
+                    return renderer
+        return None
+
+    def load(self, name, fname, **options):
+        """Call the renderer named [name] on [fname], with [options] overriding its defaults."""
+        renderer = self._renderers[name]
+        options = dict(renderer.options, **options)
+        max_bytes = options.get("max_bytes")
+        if max_bytes is not None and "max_bytes" not in renderer.parameters:
+            del options["max_bytes"]
+            size = os.path.getsize(fname)
+            if size > max_bytes:
+                raise ValueError(
+                    f"{size:,} bytes is over the {max_bytes:,} byte limit of the {name} renderer"
+                )
+        return renderer.function(fname, **options)
+
+    def render(self, fname, **template_options):
+        """Load [fname] with its renderer, returning a template function.
+        Of [template_options] (e.g. max_rows from show()), those the renderer accepts and that aren't None override its defaults.
+        """
+        renderer = self.lookup(fname)
+        if renderer is None:
+            if self.fallback is None:
+                raise ValueError(f"No renderer registered for {fname!r}")
+            warnings.warn(
+                f"No renderer registered for {fname!r}, showing it with the {self.fallback} renderer. "
+                "Register one with summarynb.register_renderer()",
+                stacklevel=3,
+            )
+            renderer = self._renderers[self.fallback]
+        options = {
+            key: value
+            for key, value in template_options.items()
+            if value is not None and key in renderer.parameters
+        }
+        return self.load(renderer.name, fname, **options)
@@ -0,0 +1,198 @@
+"""Render summaries straight to static HTML files, without executing a notebook, for `summarynb render`."""
+
+import contextlib
+import functools
+import html
+import json
+import os
+
+from . import (
+    _call_template,
+    _make_HTML,
+    chunks,
+    csv,
+    empty,
+    feather,
+    image,
+    indexed_csv,
+    parquet,
+    plaintext,
+    renderers,
+    textfile,
+)
+from .storage import atomic_write
+
+# Renderers that a spec entry may name, e.g. {"csv": "run_summary.tsv", "sep": "\t"}: (function, whether its argument is a file name).
+# File names are resolved relative to the spec file. Entries may also name renderers added with register_renderer().
+RENDERERS = {
+    "image": (image, True),
+    "csv": (csv, True),
+    "indexed_csv": (indexed_csv, True),
+    "parquet": (parquet, True),
+    "feather": (feather, True),
+    "textfile": (textfile, True),
+    "plaintext": (plaintext, False),
+    "empty": (empty, False),
+}
+
+# show() options that a report, or the spec's defaults, may set
+REPORT_OPTIONS = [
+    "max_width",
+    "max_height",
+    "thumbnails",
+    "embed",
+    "dedupe",
+    "max_rows",
+    "max_cols",
+    "page_size",
+    "page",
+]
+
+page_template = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+{heading}{grid}
+</body>
+</html>
+"""
+
+
+def load_spec(fname):
+    """Read a report spec from a JSON or YAML file (YAML requires PyYAML).
+
+    A spec is a single report, a list of reports, or {"defaults": {...}, "reports": [...]}, where defaults apply to every report.
+    Each report is a mapping with:
+        - output: HTML file to write, relative to the spec file.
+        - entries: as passed to show(). File names are relative to the spec file.
+          An entry may also name a renderer with its argument and options, e.g. {"indexed_csv": "run_1.csv"}.
+        - headers, title, and shape (lay out a flat list of entries with chunks()): optional.
+        - any of REPORT_OPTIONS, e.g. max_width or thumbnails: optional.
+
+    Returns a list of reports, with defaults applied.
+    """
+    with open(fname, "r") as f:
+        if os.path.splitext(fname)[1].lower() in [".yml", ".yaml"]:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("YAML specs require PyYAML: pip install PyYAML")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+
+    if isinstance(spec, dict) and "reports" in spec:
+        defaults, reports = spec.get("defaults") or {}, spec["reports"]
+    elif isinstance(spec, dict):
+        defaults, reports = {}, [spec]
+    else:
+        defaults, reports = {}, spec
+    if not isinstance(reports, list) or not all(
+        isinstance(report, dict) for report in reports
+    ):
+        raise ValueError(f"{fname}: reports must be a list of mappings")
+
+    unknown_defaults = set(defaults) - set(REPORT_OPTIONS)
+    if unknown_defaults:
+        raise ValueError(f"{fname}: unknown defaults {sorted(unknown_defaults)}")
+    allowed = set(REPORT_OPTIONS) | {"output", "entries", "headers", "title", "shape"}
+    for report in reports:
+        unknown = set(report) - allowed
+        if unknown:
+            raise ValueError(f"{fname}: unknown report keys {sorted(unknown)}")
+        for key in ["output", "entries"]:
+            if key not in report:
+                raise ValueError(f"{fname}: every report needs {key!r}")
+    return [dict(defaults, **report) for report in reports]
+
+
+def _resolve_entry(entry, base_dir):
+    """Turn a spec entry into what show() accepts, with file names made absolute.
+    Entries naming a renderer become templates that call the renderer when rendered."""
+    if isinstance(entry, list):
+        return [_resolve_entry(element, base_dir) for element in entry]
+    if isinstance(entry, str):
+        return os.path.join(base_dir, entry)
+    if isinstance(entry, dict):
+        available = set(RENDERERS) | {renderer.name for renderer in renderers}
+        names = set(entry) & available
+        if len(names) != 1:
+            raise ValueError(
+                f"entry {entry!r} must name exactly one of {sorted(available)}"
+            )
+        name = names.pop()
+        if name in RENDERERS:
+            renderer, takes_file = RENDERERS[name]
+        else:
+            renderer, takes_file = functools.partial(renderers.load, name), True
+        options = {key: value for key, value in entry.items() if key != name}
+        argument = entry[name]
+        if takes_file:
+            argument = os.path.join(base_dir, argument)
+
+        # load when the cell renders, so loading runs in the worker pool and errors show in the cell
+        def template(max_width, max_height, *args, embedded_images=None, **kwargs):
+            loaded = (
+                renderer(**options)
+                if argument is None
+                else renderer(argument, **options)
+            )
+            return _call_template(loaded, max_width, max_height, embedded_images)
+
+        template.embeds_images = True
+        return template
+    if entry is None:
+        return empty()
+    raise ValueError(f"unsupported entry {entry!r}")
+
+
+@contextlib.contextmanager
+def _working_directory(path):
+    # image() links to files relative to the working directory, and thumbnails are written under it,
+    # so render from the output file's directory for links to resolve from the HTML file.
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def render_report(report, base_dir, output_dir=None, workers=None):
+    """Render one report loaded by load_spec() to its output HTML file. Returns the output path.
+
+    File names in the report are relative to [base_dir]; the output path is relative to [output_dir] (default: [base_dir]).
+    Cells that fail to render show their error, as with show(..., workers=N).
+    """
+    output = os.path.abspath(os.path.join(output_dir or base_dir, report["output"]))
+    base_dir = os.path.abspath(base_dir)
+    options = {key: report[key] for key in REPORT_OPTIONS if key in report}
+    options.setdefault("max_width", 800)
+    options.setdefault("max_height", 800)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with _working_directory(os.path.dirname(output)):
+        # resolved here, because renderers like image() take file names relative to the working directory
+        entries = _resolve_entry(report["entries"], base_dir)
+        if report.get("shape") is not None:
+            entries = chunks(entries, report["shape"])
+        grid = _make_HTML(
+            entries,
+            headers=report.get("headers"),
+            workers=workers or 1,
+            **options,
+        )
+
+    title = report.get("title")
+    page = page_template.format(
+        title=html.escape(title or os.path.basename(output)),
+        heading=f"<h1>{html.escape(title)}</h1>\n" if title else "",
+        grid=grid,
+    )
+    # a page being served is never seen half-written
+    with atomic_write(output, encoding="utf-8") as w:
+        w.write(page)
+    return output
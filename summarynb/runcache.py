@@ -0,0 +1,143 @@
+"""Skip re-executing notebooks whose code and input files have not changed since their last successful run."""
+
+import glob
+import hashlib
+import json
+import os
+import re
+
+from .storage import atomic_write, file_lock
+
+# string literals in code cells, e.g. show("results/run_1.png")
+_string_literal = re.compile(r"""(?P<quote>["'])(?P<value>[^"'\n]+?)(?P=quote)""")
+
+
+def hash_file(fname, chunk_size=1 << 20):
+    """Return sha256 hex digest of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(fname, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_cell_sources(fname):
+    """Return the source of each code cell in a notebook. Outputs and metadata are ignored."""
+    with open(fname, "r") as f:
+        nb = json.load(f)
+    sources = []
+    for cell in nb.get("cells", []):
+        if cell.get("cell_type") != "code":
+            continue
+        source = cell.get("source", "")
+        if isinstance(source, list):
+            source = "".join(source)
+        sources.append(source)
+    return sources
+
+
+def detect_input_files(fname):
+    """Find files a notebook reads, by looking for string literals in its code cells that name existing files.
+
+    Paths are resolved relative to the notebook's directory, since that is where notebooks are executed.
+    Literals containing wildcards are expanded as glob patterns.
+    """
+    notebook_dir = os.path.dirname(fname)
+    notebook_path = os.path.normpath(fname)
+    inputs = set()
+    for source in code_cell_sources(fname):
+        for match in _string_literal.finditer(source):
+            candidate = os.path.normpath(
+                os.path.join(notebook_dir, match.group("value"))
+            )
+            if glob.has_magic(candidate):
+                matches = glob.glob(candidate)
+            else:
+                matches = [candidate]
+            inputs.update(
+                path
+                for path in matches
+                if path != notebook_path and os.path.isfile(path)
+            )
+    return sorted(inputs)
+
+
+class RunCache:
+    """Persistent record of the cache key of each notebook's last successful run.
+
+    File hashes are memoized by (mtime, size), so that checking an unchanged notebook does not re-read its inputs.
+    Saving merges in runs recorded concurrently, e.g. by `summarynb watch` and the pre-commit hook.
+    """
+
+    def __init__(self, fname):
+        self.fname = fname
+        self.notebooks, self.files = self._load()
+        # notebooks recorded since loading, which save() writes over the file's current record
+        self._recorded = set()
+
+    def _load(self):
+        try:
+            with open(self.fname, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # missing or corrupt cache: start over
+            data = {}
+        return data.get("notebooks", {}), data.get("files", {})
+
+    def hash_file(self, fname):
+        stat = os.stat(fname)
+        cached = self.files.get(fname)
+        if (
+            cached is not None
+            and cached["mtime_ns"] == stat.st_mtime_ns
+            and cached["size"] == stat.st_size
+        ):
+            return cached["sha256"]
+        sha256 = hash_file(fname)
+        self.files[fname] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256,
+        }
+        return sha256
+
+    def compute_key(self, fname, recorded_inputs=()):
+        """Hash a notebook's code cells together with the contents of its input files:
+        those detected in its code, and [recorded_inputs] that it was seen reading during its last run.
+        """
+        digest = hashlib.sha256()
+        for source in code_cell_sources(fname):
+            digest.update(source.encode("utf-8"))
+            digest.update(b"\0")
+        input_fnames = set(detect_input_files(fname))
+        input_fnames.update(
+            os.path.relpath(path) for path in recorded_inputs if os.path.isfile(path)
+        )
+        for input_fname in sorted(input_fnames):
+            digest.update(input_fname.encode("utf-8"))
+            digest.update(self.hash_file(input_fname).encode("ascii"))
+        return digest.hexdigest()
+
+    def is_fresh(self, fname, key):
+        return self.notebooks.get(fname) == key
+
+    def record(self, fname, key):
+        self.notebooks[fname] = key
+        self._recorded.add(fname)
+
+    def save(self):
+        """Write the runs recorded since loading, keeping those other processes recorded in the meantime."""
+        with file_lock(self.fname):
+            notebooks, files = self._load()
+            notebooks.update({fname: self.notebooks[fname] for fname in self._recorded})
+            # file hashes are keyed by mtime and size, so ours are at least as current as any
+            files.update(self.files)
+            with atomic_write(self.fname) as w:
+                json.dump(
+                    {"notebooks": notebooks, "files": files},
+                    w,
+                    indent=2,
+                    sort_keys=True,
+                )
+        self.notebooks, self.files = notebooks, files
+        self._recorded = set()
@@ -0,0 +1,53 @@
+"""Safe writes to the files summarynb keeps next to notebooks, which concurrent runs may write at once."""
+
+import contextlib
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    # no advisory file locks on Windows
+    fcntl = None
+
+# new files get the permissions open() would give them; mkstemp creates files readable only by their owner
+_umask = os.umask(0)
+os.umask(_umask)
+
+
+@contextlib.contextmanager
+def atomic_write(fname, mode="w", **kwargs):
+    """Open a temporary file next to [fname] for writing, and replace [fname] with it once written.
+
+    Readers never see a partial file, and an interrupted write leaves the old file in place. Each writer gets a
+    temporary file of its own, so concurrent writers don't trip over each other: the last to finish wins.
+    [mode] and [kwargs] are passed on to open(), e.g. mode="wb" or encoding="utf-8".
+    """
+    fd, tmp_fname = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(fname)),
+        prefix=os.path.basename(fname) + ".",
+        suffix=".tmp",
+    )
+    try:
+        with open(fd, mode, **kwargs) as w:
+            yield w
+        os.chmod(tmp_fname, 0o666 & ~_umask)
+        os.replace(tmp_fname, fname)
+    except BaseException:
+        os.remove(tmp_fname)
+        raise
+
+
+@contextlib.contextmanager
+def file_lock(fname):
+    """Hold an exclusive lock on [fname] (through a [fname].lock file next to it) for the duration, across processes.
+    Wrap a read, modify and write of [fname] in it, so concurrent changes aren't lost.
+    """
+    with open(fname + ".lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
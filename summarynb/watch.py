@@ -0,0 +1,221 @@
+"""Re-execute notebooks when they or their input files change, for `summarynb watch`."""
+
+import os
+import threading
+import time
+
+from .runcache import detect_input_files
+
+
+def dependency_graph(notebooks, recorded_inputs=None):
+    """Map the absolute path of every watched file to the notebooks that depend on it: each notebook and its input files.
+    Input files are detected in the notebook's code, plus any returned by [recorded_inputs](notebook).
+    """
+    graph = {}
+    for notebook in notebooks:
+        paths = [notebook]
+        if recorded_inputs is not None:
+            paths += list(recorded_inputs(notebook))
+        try:
+            paths += detect_input_files(notebook)
+        except (OSError, ValueError):
+            # missing or unreadable notebook: watch for it to reappear
+            pass
+        for path in paths:
+            graph.setdefault(os.path.abspath(path), []).append(notebook)
+    return graph
+
+
+class ChangeQueue:
+    """Changed paths reported by a file watcher, collected until changes settle down."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._changed = set()
+        self._last_change = None
+
+    def add(self, path):
+        with self._condition:
+            self._changed.add(path)
+            self._last_change = time.monotonic()
+            self._condition.notify_all()
+
+    def wait(self, debounce, stop=None):
+        """Block until some path changes and no further change arrives for [debounce] seconds, then return all changed paths.
+        Returns an empty set early once the [stop] event is set."""
+        with self._condition:
+            while True:
+                if stop is not None and stop.is_set():
+                    return set()
+                if self._changed:
+                    remaining = self._last_change + debounce - time.monotonic()
+                    if remaining <= 0:
+                        changed, self._changed = self._changed, set()
+                        return changed
+                else:
+                    remaining = None
+                # wake up periodically to check the stop event
+                self._condition.wait(0.2 if remaining is None else min(remaining, 0.2))
+
+
+class PollingSource:
+    """Detects changes by comparing the modification time and size of each watched file every [interval] seconds."""
+
+    def __init__(self, changes, interval=1.0):
+        self.changes = changes
+        self.interval = interval
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _snapshot(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def update(self, paths):
+        """Watch exactly [paths]. Files already watched keep their snapshot, so changes made in the meantime are still reported."""
+        with self._lock:
+            self._snapshots = {
+                path: self._snapshots[path]
+                if path in self._snapshots
+                else self._snapshot(path)
+                for path in paths
+            }
+
+    def _poll(self):
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                paths = list(self._snapshots)
+            for path in paths:
+                snapshot = self._snapshot(path)
+                with self._lock:
+                    if path not in self._snapshots:
+                        # no longer watched
+                        continue
+                    changed = self._snapshots[path] != snapshot
+                    self._snapshots[path] = snapshot
+                if changed:
+                    self.changes.add(path)
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+_write_events = {"created", "modified", "moved", "deleted", "closed"}
+
+
+class WatchdogSource:
+    """Detects changes with filesystem notifications (e.g. inotify) through watchdog, watching the directories of watched files."""
+
+    def __init__(self, changes):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        source = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                # watchdog also reports files being opened and read, e.g. by dependency_graph()
+                if event.is_directory or event.event_type not in _write_events:
+                    return
+                # editors often save by writing a temporary file and moving it into place
+                for path in [event.src_path, getattr(event, "dest_path", None)]:
+                    if path and os.path.abspath(path) in source._paths:
+                        changes.add(os.path.abspath(path))
+
+        self.changes = changes
+        self._handler = Handler()
+        self._paths = frozenset()
+        self._directories = set()
+        self._observer = Observer()
+        self._observer.start()
+
+    def update(self, paths):
+        self._paths = frozenset(paths)
+        directories = {
+            os.path.dirname(path)
+            for path in paths
+            if os.path.isdir(os.path.dirname(path))
+        }
+        if directories != self._directories:
+            self._observer.unschedule_all()
+            for directory in sorted(directories):
+                self._observer.schedule(self._handler, directory, recursive=False)
+            self._directories = directories
+
+    def stop(self):
+        self._observer.stop()
+        self._observer.join()
+
+
+def make_source(changes, polling=False, poll_interval=1.0):
+    """Use filesystem notifications if watchdog is installed, falling back to polling."""
+    if not polling:
+        try:
+            return WatchdogSource(changes)
+        except ImportError:
+            pass
+    return PollingSource(changes, interval=poll_interval)
+
+
+def watch(
+    list_notebooks,
+    run_notebooks,
+    recorded_inputs=None,
+    extra_paths=(),
+    debounce=1.0,
+    polling=False,
+    poll_interval=1.0,
+    stop=None,
+):
+    """Run notebooks, then re-run those affected whenever a notebook or one of its input files changes, until [stop] is set.
+
+    [list_notebooks]() returns the notebooks to watch, and is called again after every run, since the list may have changed.
+    [run_notebooks](notebooks) executes a list of notebooks.
+    [recorded_inputs]() returns a function giving the input files a notebook was seen reading; called again after every run.
+    A change to any of [extra_paths] (e.g. the list of notebooks itself) affects all notebooks.
+    Changes are debounced: notebooks run once changes have settled for [debounce] seconds.
+    """
+    changes = ChangeQueue()
+    source = make_source(changes, polling=polling, poll_interval=poll_interval)
+    extra_paths = {os.path.abspath(path) for path in extra_paths}
+
+    def current_graph(notebooks):
+        # inputs are recorded anew by every run
+        return dependency_graph(
+            notebooks, recorded_inputs() if recorded_inputs is not None else None
+        )
+
+    try:
+        affected = list_notebooks()
+        # start watching before the first run, so that edits made during it are seen
+        source.update(set(current_graph(affected)) | extra_paths)
+        while True:
+            if affected:
+                run_notebooks(affected)
+            notebooks = list_notebooks()
+            # recompute after each run, since a notebook may now read different files
+            graph = current_graph(notebooks)
+            source.update(set(graph) | extra_paths)
+            changed = changes.wait(debounce, stop=stop)
+            if stop is not None and stop.is_set():
+                return
+            if changed & extra_paths:
+                affected = notebooks
+            else:
+                affected_set = {
+                    notebook for path in changed for notebook in graph.get(path, [])
+                }
+                # keep the order of the notebook list
+                affected = [
+                    notebook for notebook in notebooks if notebook in affected_set
+                ]
+    finally:
+        source.stop()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+import os
+import pytest
+import summarynb
+from summarynb.cache import RenderCache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    summarynb.cache_clear()
+    yield
+    summarynb.cache_clear()
+
+
+def test_csv_is_rendered_once_until_file_changes(tmp_path):
+    fname = tmp_path / "table.csv"
+    fname.write_text("a,b\n1,2\n")
+    html = summarynb.csv(str(fname))()
+    assert summarynb.csv(str(fname))() == html
+    assert summarynb.cache_info().hits == 1
+    assert summarynb.cache_info().misses == 1
+
+    # different render options are cached separately
+    summarynb.csv(str(fname), cols=["a"])()
+    assert summarynb.cache_info().misses == 2
+
+    fname.write_text("a,b\n3,4\n")
+    os.utime(fname, ns=(0, 0))
+    assert "<td>3</td>" in summarynb.csv(str(fname))()
+    info = summarynb.cache_info()
+    assert info.misses == 3
+    # the render of the outdated file was dropped
+    assert info.entries == 2
+
+
+def test_textfile_is_cached():
+    summarynb.textfile("tests/data/test.txt")
+    summarynb.textfile("tests/data/test.txt")
+    assert summarynb.cache_info().hits == 1
+    summarynb.cache_clear()
+    assert summarynb.cache_info() == (0, 0, 0, 0, summarynb.cache_info().max_bytes)
+
+
+def test_lru_eviction_respects_budget(tmp_path):
+    cache = RenderCache(max_bytes=10)
+    for name in ["a", "b", "c"]:
+        (tmp_path / name).write_text(name)
+    cache.get_or_render(str(tmp_path / "a"), None, lambda: "aaaa")
+    cache.get_or_render(str(tmp_path / "b"), None, lambda: "bbbb")
+    # touch "a" so that "b" is least recently used
+    cache.get_or_render(str(tmp_path / "a"), None, lambda: "unused")
+    cache.get_or_render(str(tmp_path / "c"), None, lambda: "cccc")
+    assert cache.info().entries == 2
+    assert cache.info().current_bytes == 8
+    assert cache.get_or_render(str(tmp_path / "a"), None, lambda: "new") == "aaaa"
+    assert cache.get_or_render(str(tmp_path / "b"), None, lambda: "new") == "new"
+
+    cache.resize(0)
+    assert cache.info().entries == 0
+    assert cache.get_or_render(str(tmp_path / "a"), None, lambda: "new") == "new"
+    assert cache.info().entries == 0
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+import pytest
+from summarynb import execution
+
+nbformat = pytest.importorskip("nbformat")
+pytest.importorskip("nbclient")
+pytest.importorskip("ipykernel")
+
+
+def write_notebook(path, *sources):
+    nb = nbformat.v4.new_notebook(
+        cells=[nbformat.v4.new_code_cell(source) for source in sources]
+    )
+    nb.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3"}
+    nb.cells[0].metadata["tags"] = ["to-be-cleared"]
+    nbformat.write(nb, str(path))
+
+
+def test_execute_with_kernel_runs_in_notebook_directory_and_strips_metadata(
+    tmp_path,
+):
+    (tmp_path / "input.txt").write_text("hello")
+    notebook = tmp_path / "summary.ipynb"
+    write_notebook(notebook, "print(open('input.txt').read())", "x = 1\nx + 1")
+    pool = execution.KernelPool(size=1, expected=1)
+    try:
+        assert execution.execute_with_kernel(str(notebook), pool).returncode == 0
+    finally:
+        pool.shutdown()
+
+    nb = nbformat.read(str(notebook), as_version=4)
+    assert nb.cells[0].outputs[0].text == "hello\n"
+    assert nb.cells[1].outputs[0].data["text/plain"] == "2"
+    assert nb.metadata == {}
+    assert nb.cells[0].metadata == {}
+
+
+def test_execute_with_kernel_reports_failure_without_writing(tmp_path):
+    notebook = tmp_path / "summary.ipynb"
+    write_notebook(notebook, "raise ValueError('broken')")
+    original = notebook.read_text()
+    pool = execution.KernelPool(size=1, expected=1)
+    try:
+        assert execution.execute_with_kernel(str(notebook), pool).returncode == 1
+    finally:
+        pool.shutdown()
+    assert notebook.read_text() == original
+
+
+def test_execute_with_kernel_passes_environment(tmp_path):
+    notebooks = [tmp_path / "warm.ipynb", tmp_path / "cold.ipynb"]
+    for notebook in notebooks:
+        write_notebook(notebook, "import os\nprint(os.environ['SUMMARYNB_TEST_VAR'])")
+    # the first notebook gets the warm kernel, the second a newly started one
+    pool = execution.KernelPool(size=1, expected=1)
+    try:
+        for notebook in notebooks:
+            assert (
+                execution.execute_with_kernel(
+                    str(notebook), pool, env={"SUMMARYNB_TEST_VAR": notebook.name}
+                ).returncode
+                == 0
+            )
+    finally:
+        pool.shutdown()
+    for notebook in notebooks:
+        nb = nbformat.read(str(notebook), as_version=4)
+        assert nb.cells[0].outputs[0].text == notebook.name + "\n"
+
+
+def test_execute_with_kernel_enforces_timeout(tmp_path):
+    notebook = tmp_path / "summary.ipynb"
+    write_notebook(notebook, "import time\ntime.sleep(60)")
+    pool = execution.KernelPool(size=1, expected=1)
+    try:
+        result = execution.execute_with_kernel(str(notebook), pool, timeout=2)
+    finally:
+        pool.shutdown()
+    assert result.returncode == 1
+    assert result.timed_out
+
+
+def test_execute_with_kernel_enforces_memory_limit_and_reports_peak_memory(
+    tmp_path,
+):
+    notebook = tmp_path / "summary.ipynb"
+    write_notebook(notebook, "x = bytearray(4 * 1024 ** 3)")
+    pool = execution.KernelPool(size=1, expected=1)
+    try:
+        result = execution.execute_with_kernel(
+            str(notebook), pool, memory_limit=2 * 1024**3
+        )
+        assert result.returncode == 1
+        assert not result.timed_out
+
+        write_notebook(notebook, "x = bytearray(64 * 1024 ** 2)")
+        result = execution.execute_with_kernel(str(notebook), pool)
+    finally:
+        pool.shutdown()
+    assert result.returncode == 0
+    if result.peak_rss is not None:
+        assert result.peak_rss > 64 * 1024**2
+
+
+def test_execute_with_nbconvert_enforces_timeout(tmp_path):
+    notebook = tmp_path / "summary.ipynb"
+    write_notebook(notebook, "import time\ntime.sleep(60)")
+    result = execution.execute_with_nbconvert(str(notebook), timeout=5)
+    assert result.returncode != 0
+    assert result.timed_out
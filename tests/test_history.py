@@ -0,0 +1,52 @@
+import pytest
+
+from summarynb import history
+
+
+def test_parse_and_format_size():
+    assert history.parse_size("512M") == 512 * 1024**2
+    assert history.parse_size("1.5GB") == int(1.5 * 1024**3)
+    assert history.parse_size("2gib") == 2 * 1024**3
+    assert history.parse_size("1000") == 1000
+    assert history.parse_size(4096) == 4096
+    with pytest.raises(ValueError):
+        history.parse_size("lots")
+    assert history.format_size(None) == "-"
+    assert history.format_size(512) == "512.0 B"
+    assert history.format_size(3 * 1024**3) == "3.0 GB"
+
+
+def record(notebook, seconds, status="ok"):
+    return history.RunRecord(
+        notebook=notebook,
+        started="2020-01-01T00:00:00",
+        seconds=seconds,
+        peak_rss=100 * 1024**2,
+        status=status,
+        engine="kernel",
+    )
+
+
+def test_history_round_trip_and_trends(tmp_path):
+    fname = str(tmp_path / ".summarynb.history")
+    assert history.read_runs(fname) == []
+    records = [record("a.ipynb", seconds) for seconds in [1, 2, 3, 10]]
+    records.append(record("b.ipynb", 60, status="timed out"))
+    history.append_runs(fname, records[:2])
+    history.append_runs(fname, records[2:])
+    with open(fname, "a") as w:
+        # interrupted write
+        w.write('{"notebook": "a.ip')
+    assert history.read_runs(fname) == records
+
+    a, b = history.summarize(records, window=2)
+    assert (a.notebook, a.runs, a.failures) == ("a.ipynb", 4, 0)
+    assert a.latest_seconds == 10
+    # median of the two runs before the latest
+    assert a.median_seconds == 2.5
+    assert (b.runs, b.failures, b.latest_seconds, b.median_seconds) == (
+        1,
+        1,
+        None,
+        None,
+    )
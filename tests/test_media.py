@@ -1,5 +1,8 @@
 #!/usr/bin/env python
 
+import os
+import shutil
+import pytest
 import summarynb
 
 
@@ -20,6 +23,288 @@ def test_textfile():
     assert summarynb.textfile("tests/data/test.txt")() == "<pre>Test from file\n</pre>"
 
 
+def test_plaintext_escapes_html():
+    assert summarynb.plaintext("a < b & c")() == "<pre>a &lt; b &amp; c</pre>"
+
+
+def test_textfile_excerpts(tmp_path):
+    fname = str(tmp_path / "run.log")
+    with open(fname, "w") as w:
+        w.write("".join(f"line {i}\n" for i in range(100)))
+
+    def shown_lines(html):
+        return [
+            line
+            for line in html.replace("<pre>", "").splitlines()
+            if line.startswith("line")
+        ]
+
+    html = summarynb.textfile(fname, max_lines=3)()
+    assert shown_lines(html) == ["line 0", "line 1", "line 2"]
+    assert "bytes omitted" in html
+    html = summarynb.textfile(fname, max_bytes=16, lines="tail")()
+    assert shown_lines(html) == ["line 98", "line 99"]
+    html = summarynb.textfile(fname, max_lines=4, lines="both")()
+    assert shown_lines(html) == ["line 0", "line 1", "line 98", "line 99"]
+    html = summarynb.textfile(fname, grep=r"^line (5|50)$", context=1)()
+    assert shown_lines(html) == [
+        "line 4",
+        "line 5",
+        "line 6",
+        "line 49",
+        "line 50",
+        "line 51",
+    ]
+    assert html.count("bytes omitted") == 3
+    # small enough to show in full
+    assert summarynb.textfile(fname)() == "<pre>{}</pre>".format(
+        "".join(f"line {i}\n" for i in range(100))
+    )
+    with pytest.raises(ValueError):
+        summarynb.textfile(fname, lines="middle")
+
+
+def test_textfile_memory_is_bounded(tmp_path):
+    import tracemalloc
+
+    fname = str(tmp_path / "big.log")
+    with open(fname, "w") as w:
+        for _ in range(200):
+            w.write("x" * 99 + "\n" + ("y" * 99 + "\n") * 999)
+    tracemalloc.start()
+    try:
+        html = summarynb.textfile(fname, max_bytes=10000, grep="x")()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(html) < 20000
+    assert peak < 1024**2
+
+
 def test_empty():
     assert summarynb.empty(width=None)(800) == '<div style="min-width: 800px;"></div>'
     assert summarynb.empty(width=1600)(800) == '<div style="min-width: 1600px;"></div>'
+
+
+def test_image_thumbnail(tmp_path, monkeypatch):
+    pytest.importorskip("PIL")
+    from PIL import Image
+
+    Image.new("RGB", (400, 200)).save(tmp_path / "big.png")
+    monkeypatch.chdir(tmp_path)
+    html = summarynb.image("big.png", thumbnail=True)(100, 100)
+    thumbnail_src = os.path.join(
+        summarynb.THUMBNAIL_CACHE_DIR, os.listdir(summarynb.THUMBNAIL_CACHE_DIR)[0]
+    )
+    assert html == (
+        f'<a href="big.png" target="_blank"><img src="{thumbnail_src}" loading="lazy" style="max-width: 100px; max-height: 100px;" /></a>'
+    )
+    with Image.open(thumbnail_src) as thumbnail:
+        assert thumbnail.size == (100, 50)
+
+    # cached thumbnail is reused until the source changes
+    assert summarynb.image("big.png", thumbnail=True)(100, 100) == html
+    Image.new("RGB", (400, 400)).save(tmp_path / "big.png")
+    os.utime("big.png", ns=(0, 0))
+    assert summarynb.image("big.png", thumbnail=True)(100, 100) != html
+
+    # small images and unconstrained dimensions are served as-is
+    assert 'img src="big.png"' in summarynb.image("big.png", thumbnail=True)(None, None)
+    assert 'img src="big.png"' in summarynb.image("big.png", thumbnail=True)(800, 800)
+
+
+def test_image_thumbnail_made_concurrently(tmp_path, monkeypatch):
+    pytest.importorskip("PIL")
+    from PIL import Image
+
+    Image.new("RGB", (2000, 1000)).save(tmp_path / "big.png")
+    monkeypatch.chdir(tmp_path)
+    for _ in range(5):
+        shutil.rmtree(summarynb.THUMBNAIL_CACHE_DIR, ignore_errors=True)
+        html = summarynb._make_HTML(
+            ["big.png"] * 16,
+            headers=None,
+            max_width=100,
+            max_height=100,
+            workers=16,
+            thumbnails=True,
+        )
+        assert "Error" not in html
+        # one thumbnail, and no temporary files left behind
+        assert len(os.listdir(summarynb.THUMBNAIL_CACHE_DIR)) == 1
+
+
+@pytest.fixture
+def long_csv(tmp_path):
+    fname = tmp_path / "long.csv"
+    fname.write_text("a,b\n" + "".join(f"{i},{i * 2}\n" for i in range(1000)))
+    return str(fname)
+
+
+def test_csv_head(long_csv):
+    html = summarynb.csv(long_csv, max_rows=3)()
+    assert "<td>2</td>" in html and "<td>3</td>" not in html
+    assert "<p>Showing 3 of 1000 rows.</p>" in html
+
+
+def test_csv_tail(long_csv):
+    html = summarynb.csv(long_csv, max_rows=2, rows="tail")()
+    assert "<th>998</th>\n      <td>998</td>\n      <td>1996</td>" in html
+    assert "<th>999</th>\n      <td>999</td>\n      <td>1998</td>" in html
+    assert "<td>997</td>" not in html
+    assert "<p>Showing 2 of 1000 rows.</p>" in html
+
+
+def test_csv_sample_is_reproducible(long_csv):
+    html = summarynb.csv(long_csv, max_rows=10, rows="sample")()
+    assert html == summarynb.csv(long_csv, max_rows=10, rows="sample")()
+    assert "of 1000 rows.</p>" in html
+
+
+def test_csv_sample_without_header(tmp_path):
+    fname = tmp_path / "values.csv"
+    fname.write_text("1\n2\n3\n4\n5\n")
+    # offsets from 0, including the start of the first line
+    for seed in range(20):
+        lines = summarynb._sample_lines(str(fname), 3, start=0, seed=seed)
+        assert 1 <= len(lines) <= 3
+        assert set(lines) <= {b"%d\n" % i for i in range(1, 6)}
+    assert b"1\n" in summarynb._sample_lines(str(fname), 10, start=0)
+    html = summarynb.csv(str(fname), max_rows=3, rows="sample", header=None)()
+    assert "of 5 rows" in html
+
+
+def test_csv_excerpt_with_names(tmp_path):
+    fname = tmp_path / "no_header.csv"
+    fname.write_text("".join(f"{i},{i}\n" for i in range(10)))
+    df, total_rows = summarynb._read_csv_excerpt(
+        str(fname), 3, rows="tail", names=["a", "b"]
+    )
+    assert total_rows == 10
+    assert df["a"].tolist() == [7, 8, 9]
+    assert df.index.tolist() == [7, 8, 9]
+    df, total_rows = summarynb._read_csv_excerpt(
+        str(fname), 3, rows="sample", names=["a", "b"]
+    )
+    assert total_rows == 10
+    assert 1 <= len(df) <= 3 and (df["a"] == df["b"]).all()
+    assert df["a"].is_monotonic_increasing
+    # an explicit header line is still skipped
+    df, total_rows = summarynb._read_csv_excerpt(
+        str(fname), 3, rows="tail", names=["a", "b"], header=0
+    )
+    assert total_rows == 9 and df["a"].tolist() == [7, 8, 9]
+
+
+def test_csv_excerpt_of_short_file_shows_everything():
+    html = summarynb.csv("tests/data/run_1.csv", max_rows=1000, rows="tail")()
+    assert html == summarynb.csv("tests/data/run_1.csv")()
+
+
+def test_csv_max_cols(long_csv):
+    assert "..." in summarynb.csv(long_csv, max_rows=3, max_cols=1)()
+
+
+@pytest.fixture(params=["parquet", "feather", "arrows"])
+def columnar_file(request, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    table = pa.table(
+        {"x": list(range(1000)), "y": [2 * i for i in range(1000)], "z": ["z"] * 1000}
+    )
+    fname = str(tmp_path / f"long.{request.param}")
+    if request.param == "parquet":
+        pa.parquet.write_table(table, fname, row_group_size=100)
+    elif request.param == "feather":
+        import pyarrow.feather
+
+        pa.feather.write_feather(table, fname, chunksize=100)
+    else:
+        with pa.ipc.new_stream(fname, table.schema) as w:
+            for batch in table.to_batches(max_chunksize=100):
+                w.write_batch(batch)
+    return fname
+
+
+def test_columnar_excerpts(columnar_file):
+    html = summarynb._get_template(columnar_file, max_rows=3)()
+    assert "<td>2</td>" in html and "<td>3</td>" not in html
+    assert "<th>z</th>" in html
+    if not columnar_file.endswith(".arrows"):
+        # streams have no index to count rows from
+        assert "<p>Showing 3 of 1000 rows.</p>" in html
+
+    read = (
+        summarynb.parquet if columnar_file.endswith(".parquet") else summarynb.feather
+    )
+    html = read(columnar_file, cols=["y", "x"], max_rows=2, rows="tail")()
+    assert "<th>998</th>\n      <td>1996</td>\n      <td>998</td>" in html
+    assert "<th>z</th>" not in html and "<td>997</td>" not in html
+    assert "<p>Showing 2 of 1000 rows.</p>" in html
+
+    assert "<p>Showing" not in read(columnar_file, cols=["x"])()
+    with pytest.raises(ValueError):
+        read(columnar_file, rows="sample")
+
+
+def test_image_embed_and_dedupe():
+    html = summarynb.image("tests/data/run_1.png", embed=True)(800, 800)
+    assert html.startswith('<img src="data:image/png;base64,iVBOR')
+    assert 'class="summarynb-embed-' in html
+
+    # not deduplicated by default, so every copy displays without JavaScript
+    entries = ["tests/data/run_1.png", "tests/data/run_1.png"]
+    html = summarynb._make_HTML(
+        entries, headers=None, max_width=800, max_height=800, embed=True
+    )
+    assert html.count("base64") == 2
+
+    # with dedupe, later copies in the same output reference the first copy
+    deduped = summarynb.image("tests/data/run_1.png", embed=True, dedupe=True)
+    html = summarynb._make_HTML(
+        [deduped, deduped], headers=None, max_width=800, max_height=800
+    )
+    assert html.count("base64") == 1
+    assert html.count('data-summarynb-ref="') == 1 and "<script>" in html
+
+
+def test_show_dedupes_embedded_images(monkeypatch):
+    import IPython.display
+
+    shown = []
+    monkeypatch.setattr(
+        IPython.display, "display", lambda html: shown.append(html.data)
+    )
+    summarynb.show(
+        [["tests/data/run_1.png", "tests/data/run_1.png", "tests/data/run_1.png"]],
+        embed=True,
+        dedupe=True,
+        workers=3,
+    )
+    (html,) = shown
+    # embedded once, and the script pointing the other copies at it is included once
+    assert html.count("data:image/png;base64,") == 1
+    assert html.count('data-summarynb-ref="') == 2
+    assert html.count("<script>") == 1
+
+
+def test_image_embed_rendered_again():
+    # re-running a cell replaces its output, so each output must hold its own copy of the image
+    deduped = summarynb.image("tests/data/run_1.png", embed=True, dedupe=True)
+    for entries in [["tests/data/run_1.png"], [deduped]]:
+        for _ in range(2):
+            html = summarynb._make_HTML(
+                entries, headers=None, max_width=800, max_height=800, embed=True
+            )
+            assert "data:image/png;base64," in html
+            assert "data-summarynb-ref" not in html
+
+
+def test_image_embed_recompressed():
+    pytest.importorskip("PIL")
+    html = summarynb.image("tests/data/run_1.png", embed="webp", quality=50)(800, 800)
+    assert html.startswith('<img src="data:image/webp;base64,')
+    with pytest.raises(ValueError):
+        summarynb.image("tests/data/run_1.png", embed="tiff")(800, 800)
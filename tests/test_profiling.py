@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+
+import json
+import summarynb
+
+
+def test_profile_records_each_cell(tmp_path):
+    summarynb.cache_clear()
+    entries = [
+        ["tests/data/run_1.png", "tests/data/run_1.csv"],
+        ["tests/data/test.txt"],
+    ]
+    with summarynb.profile() as profiler:
+        summarynb.show(entries)
+        summarynb.show("tests/data/run_2.png", workers=2)
+
+    summary = profiler.summary()
+    assert len(summary) == 4
+    assert list(summary["total_seconds"]) == sorted(
+        summary["total_seconds"], reverse=True
+    )
+    csv_cell = summary.set_index("entry").loc["tests/data/run_1.csv"]
+    assert (csv_cell["show_number"], csv_cell["row"], csv_cell["column"]) == (1, 0, 1)
+    assert csv_cell["bytes_read"] > 0
+    assert csv_cell["html_bytes"] > 0
+    assert [display.show_number for display in profiler.displays] == [1, 2]
+
+    profiler.to_json(tmp_path / "profile.json")
+    assert len(json.loads((tmp_path / "profile.json").read_text())["cells"]) == 4
+    profiler.to_chrome_trace(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert {event["cat"] for event in events} == {"load", "render", "layout", "display"}
+    assert len(events) == 4 * 2 + 2 * 2
+
+
+def test_profile_off_by_default():
+    with summarynb.profile() as profiler:
+        pass
+    summarynb.show("tests/data/run_1.png")
+    assert profiler.cells == []
+    assert summarynb.active_profiler() is None
+
+
+def test_show_profile_displays_summary(capsys):
+    summarynb.show("tests/data/run_1.png", profile=True)
+    # outside IPython, display() prints a placeholder for each HTML object: the grid, then the summary
+    assert capsys.readouterr().out.count("HTML object") == 2
@@ -0,0 +1,103 @@
+import pytest
+
+import summarynb
+from summarynb.renderers import RendererRegistry
+
+
+def renderer_name(fname):
+    renderer = summarynb.renderers.lookup(fname)
+    return renderer.name if renderer is not None else None
+
+
+def test_builtin_lookup(tmp_path):
+    assert renderer_name("run_1.csv") == "csv"
+    assert renderer_name("results/RUN_1.CSV.GZ") == "csv"
+    assert renderer_name("run_summary.tsv") == "tsv"
+    assert renderer_name("plot.PNG") == "image"
+    assert renderer_name("train.log") == "textfile"
+    assert renderer_name("table.parquet") == "parquet"
+    # by MIME type
+    assert renderer_name("scan.tiff") == "image"
+    assert renderer_name("notes.md") == "textfile"
+    # by content
+    (tmp_path / "plot.dat").write_bytes(b"\x89PNG\r\n\x1a\n" + b"\0" * 16)
+    (tmp_path / "table").write_bytes(b"PAR1" + b"\0" * 16)
+    (tmp_path / "unknown.dat").write_bytes(b"\0" * 16)
+    assert renderer_name(str(tmp_path / "plot.dat")) == "image"
+    assert renderer_name(str(tmp_path / "table")) == "parquet"
+    assert renderer_name(str(tmp_path / "unknown.dat")) is None
+
+
+def test_unknown_files_warn_and_show_as_image(tmp_path):
+    (tmp_path / "unknown.dat").write_bytes(b"\0" * 16)
+    with pytest.warns(UserWarning, match="No renderer registered"):
+        html = summarynb._get_template(str(tmp_path / "unknown.dat"))(800, 800)
+    assert html.startswith("<img")
+
+
+def test_register_renderer_with_options_and_cost_limits(tmp_path):
+    registry = RendererRegistry()
+    calls = []
+
+    def table_reader(fname, max_rows=None, flavor="plain"):
+        calls.append((fname, max_rows, flavor))
+        return lambda *args, **kwargs: "table"
+
+    def blob_reader(fname):
+        return lambda *args, **kwargs: "blob"
+
+    registry.register(
+        table_reader,
+        extensions=[".tbl"],
+        mime_types=["application/x-table"],
+        max_rows=50,
+        flavor="fancy",
+    )
+    registry.register(
+        blob_reader, extensions=[".blob"], magic=[(4, b"BLOB")], max_bytes=10
+    )
+
+    assert registry.render("a.tbl")() == "table"
+    # show() options override defaults, unless None; options the renderer doesn't take are dropped
+    registry.render("b.tbl", max_rows=5, thumbnails=True)
+    registry.render("c.tbl", max_rows=None)
+    assert calls == [
+        ("a.tbl", 50, "fancy"),
+        ("b.tbl", 5, "fancy"),
+        ("c.tbl", 50, "fancy"),
+    ]
+
+    (tmp_path / "small.blob").write_bytes(b"12345")
+    (tmp_path / "big.blob").write_bytes(b"0123456789abcdef")
+    (tmp_path / "sniffed").write_bytes(b"xxxxBLOB")
+    assert registry.render(str(tmp_path / "small.blob"))() == "blob"
+    assert registry.render(str(tmp_path / "sniffed"))() == "blob"
+    with pytest.raises(ValueError, match="byte limit"):
+        registry.render(str(tmp_path / "big.blob"))
+
+    # later registrations take precedence
+    registry.register(blob_reader, name="tables_as_blobs", extensions=[".tbl"])
+    assert registry.lookup("a.tbl").name == "tables_as_blobs"
+    registry.unregister("tables_as_blobs")
+    assert registry.lookup("a.tbl").name == "table_reader"
+    with pytest.raises(ValueError, match="No renderer registered"):
+        registry.render("unknown.dat")
+
+
+def test_registered_renderer_in_show_and_reports(tmp_path):
+    (tmp_path / "run.tbl").write_text("hello")
+    summarynb.register_renderer(
+        lambda fname: summarynb.plaintext(open(fname).read().upper()),
+        name="shouting",
+        extensions=[".tbl"],
+    )
+    try:
+        assert (
+            summarynb._get_template(str(tmp_path / "run.tbl"))() == "<pre>HELLO</pre>"
+        )
+        from summarynb.report import _resolve_entry
+
+        template = _resolve_entry({"shouting": "run.tbl"}, str(tmp_path))
+        assert template(800, 800) == "<pre>HELLO</pre>"
+    finally:
+        summarynb.renderers.unregister("shouting")
@@ -0,0 +1,122 @@
+import json
+import os
+import shutil
+import pytest
+from click.testing import CliRunner
+
+from summarynb import cli, report
+
+data_dir = os.path.join(os.path.dirname(__file__), "data")
+
+
+@pytest.fixture
+def spec_dir(tmp_path):
+    for fname in ["run_1.png", "run_1.csv", "test.txt"]:
+        shutil.copy(os.path.join(data_dir, fname), tmp_path / fname)
+    return tmp_path
+
+
+def test_render_writes_reports_with_paths_relative_to_output(spec_dir):
+    spec = {
+        "defaults": {"max_width": 400},
+        "reports": [
+            {
+                "output": "reports/run_1.html",
+                "title": "Run <1>",
+                "headers": ["Plot", "Table"],
+                "entries": ["run_1.png", {"indexed_csv": "run_1.csv"}],
+            },
+            {
+                "output": "text.html",
+                "entries": [
+                    "test.txt",
+                    "missing.png",
+                    {"plaintext": "hello"},
+                    {"csv": "data/nope.csv"},
+                ],
+                "shape": 2,
+            },
+        ],
+    }
+    (spec_dir / "spec.json").write_text(json.dumps(spec))
+
+    result = CliRunner().invoke(cli.main, ["render", str(spec_dir / "spec.json")])
+    assert result.exit_code == 0, result.output
+    assert "Rendered 2 reports" in result.output
+
+    page = (spec_dir / "reports" / "run_1.html").read_text()
+    assert "<h1>Run &lt;1&gt;</h1>" in page
+    assert 'src="../run_1.png"' in page
+    assert "max-width: 400px" in page
+    assert "<th" in page and "Table" in page
+
+    page = (spec_dir / "text.html").read_text()
+    assert "Test from file" in page
+    assert "<pre>hello</pre>" in page
+    # a named entry that fails to load shows its error in its cell, instead of failing the report
+    assert "FileNotFoundError" in page and "nope.csv" in page
+    # chunks() laid out the four entries in two rows
+    assert page.count("<tr>") == 2
+
+
+def test_render_yaml_spec_and_output_dir(spec_dir, tmp_path_factory):
+    pytest.importorskip("yaml")
+    (spec_dir / "spec.yaml").write_text(
+        "output: summary.html\nentries:\n  - [run_1.png]\n  - [run_1.csv]\n"
+    )
+    output_dir = tmp_path_factory.mktemp("out")
+    result = CliRunner().invoke(
+        cli.main, ["render", str(spec_dir / "spec.yaml"), "-o", str(output_dir)]
+    )
+    assert result.exit_code == 0, result.output
+    page = (output_dir / "summary.html").read_text()
+    assert os.path.relpath(spec_dir / "run_1.png", output_dir) in page
+
+
+def test_render_named_image_entries_to_output_dir(
+    spec_dir, tmp_path_factory, monkeypatch
+):
+    pytest.importorskip("PIL")
+    (spec_dir / "spec.json").write_text(
+        json.dumps(
+            {
+                "output": "summary.html",
+                "max_width": 50,
+                "entries": [
+                    "run_1.png",
+                    {"image": "run_1.png"},
+                    {"image": "run_1.png", "thumbnail": True},
+                ],
+            }
+        )
+    )
+    output_dir = tmp_path_factory.mktemp("out")
+    # render from elsewhere: links must still be relative to the report
+    monkeypatch.chdir(spec_dir)
+    result = CliRunner().invoke(
+        cli.main, ["render", "spec.json", "-o", str(output_dir)]
+    )
+    assert result.exit_code == 0, result.output
+    page = (output_dir / "summary.html").read_text()
+    link = os.path.relpath(spec_dir / "run_1.png", output_dir)
+    assert page.count(f'src="{link}"') == 2
+    assert f'<a href="{link}"' in page
+    assert "Error" not in page
+    thumbnails = list((output_dir / ".summarynb_thumbnails").iterdir())
+    assert len(thumbnails) == 1
+
+
+def test_render_reports_invalid_specs(spec_dir):
+    (spec_dir / "bad.json").write_text(json.dumps({"entries": ["run_1.png"]}))
+    (spec_dir / "good.json").write_text(
+        json.dumps({"output": "good.html", "entries": ["run_1.png"]})
+    )
+    result = CliRunner().invoke(
+        cli.main, ["render", str(spec_dir / "bad.json"), str(spec_dir / "good.json")]
+    )
+    assert result.exit_code == 1
+    assert "every report needs 'output'" in result.output
+    assert (spec_dir / "good.html").exists()
+
+    with pytest.raises(ValueError):
+        report._resolve_entry({"csv": "a.csv", "image": "b.png"}, str(spec_dir))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+import json
+import threading
+from summarynb import runcache
+from summarynb.deps import DependencyStore
+
+
+def write_notebook(path, *sources, outputs=None):
+    path.write_text(
+        json.dumps(
+            {
+                "cells": [
+                    {"cell_type": "markdown", "source": ["# Summary"]},
+                    *[
+                        {
+                            "cell_type": "code",
+                            "source": source,
+                            "outputs": outputs or [],
+                        }
+                        for source in sources
+                    ],
+                ]
+            }
+        )
+    )
+
+
+def test_detect_input_files(tmp_path):
+    (tmp_path / "plots").mkdir()
+    (tmp_path / "plots" / "a.png").write_bytes(b"a")
+    (tmp_path / "plots" / "b.png").write_bytes(b"b")
+    (tmp_path / "table.csv").write_text("x\n1\n")
+    notebook = tmp_path / "summary.ipynb"
+    write_notebook(
+        notebook,
+        ["from summarynb import show\n", "show(['table.csv', \"missing.csv\"])"],
+        "show(chunks(glob.glob('plots/*.png'), 2))",
+    )
+    assert runcache.detect_input_files(str(notebook)) == [
+        str(tmp_path / "plots" / "a.png"),
+        str(tmp_path / "plots" / "b.png"),
+        str(tmp_path / "table.csv"),
+    ]
+
+
+def test_cache_key_ignores_outputs_but_tracks_code_and_inputs(tmp_path):
+    (tmp_path / "table.csv").write_text("x\n1\n")
+    notebook = tmp_path / "summary.ipynb"
+    cache = runcache.RunCache(str(tmp_path / ".summarynb.cache"))
+
+    write_notebook(notebook, "show('table.csv')")
+    key = cache.compute_key(str(notebook))
+    write_notebook(notebook, "show('table.csv')", outputs=[{"text": "new output"}])
+    assert cache.compute_key(str(notebook)) == key
+
+    (tmp_path / "table.csv").write_text("x\n2\n")
+    assert cache.compute_key(str(notebook)) != key
+
+    write_notebook(notebook, "show('table.csv', max_width=100)")
+    assert cache.compute_key(str(notebook)) != key
+
+
+def test_run_cache_persists(tmp_path):
+    fname = str(tmp_path / ".summarynb.cache")
+    cache = runcache.RunCache(fname)
+    cache.record("summary.ipynb", "abc")
+    cache.save()
+    assert runcache.RunCache(fname).is_fresh("summary.ipynb", "abc")
+    assert not runcache.RunCache(fname).is_fresh("summary.ipynb", "def")
+    assert not runcache.RunCache(str(tmp_path / "missing")).is_fresh(
+        "summary.ipynb", "abc"
+    )
+
+
+def test_run_cache_merges_concurrent_saves(tmp_path):
+    fname = str(tmp_path / ".summarynb.cache")
+    errors = []
+
+    def run(i):
+        # each process loads the cache, records its notebook and saves, over and over
+        try:
+            for round_num in range(50):
+                cache = runcache.RunCache(fname)
+                cache.record(f"{i}.ipynb", str(round_num))
+                cache.save()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    cache = runcache.RunCache(fname)
+    assert all(cache.is_fresh(f"{i}.ipynb", "49") for i in range(4))
+
+
+def test_dependency_store_merges_concurrent_saves(tmp_path):
+    fname = str(tmp_path / ".summarynb.deps")
+    (tmp_path / "data.csv").write_text("x\n1\n")
+    # e.g. `summarynb watch` and the pre-commit hook, each running one notebook
+    first, second = DependencyStore(fname), DependencyStore(fname)
+    first.record(
+        str(tmp_path / "a.ipynb"), [str(tmp_path / "data.csv")], runcache.hash_file
+    )
+    second.record(
+        str(tmp_path / "b.ipynb"), [str(tmp_path / "data.csv")], runcache.hash_file
+    )
+    first.save()
+    second.save()
+    assert DependencyStore(fname).dependents(str(tmp_path / "data.csv")) == [
+        "a.ipynb",
+        "b.ipynb",
+    ]
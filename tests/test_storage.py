@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+import os
+import threading
+import pytest
+
+from summarynb import storage
+from summarynb.storage import atomic_write, file_lock
+
+
+def run_in_threads(target, n_threads):
+    errors = []
+
+    def run(i):
+        try:
+            target(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_atomic_write(tmp_path):
+    fname = str(tmp_path / "record.json")
+    with atomic_write(fname) as w:
+        w.write("first")
+    assert open(fname).read() == "first"
+    # permissions as if written with open(), not mkstemp's owner-only ones
+    assert os.stat(fname).st_mode & 0o777 == 0o666 & ~storage._umask
+
+    # a failed write leaves the old file, and no temporary files, behind
+    with pytest.raises(RuntimeError):
+        with atomic_write(fname) as w:
+            w.write("partial")
+            raise RuntimeError
+    assert open(fname).read() == "first"
+    assert os.listdir(tmp_path) == ["record.json"]
+
+    def write(i):
+        for _ in range(50):
+            with atomic_write(fname) as w:
+                w.write(str(i))
+
+    assert run_in_threads(write, 4) == []
+    assert open(fname).read() in ["0", "1", "2", "3"]
+    assert os.listdir(tmp_path) == ["record.json"]
+
+
+def test_file_lock_serializes_updates(tmp_path):
+    fname = str(tmp_path / "counter")
+    with atomic_write(fname) as w:
+        w.write("0")
+
+    def increment(i):
+        for _ in range(50):
+            with file_lock(fname):
+                count = int(open(fname).read())
+                with atomic_write(fname) as w:
+                    w.write(str(count + 1))
+
+    assert run_in_threads(increment, 4) == []
+    assert open(fname).read() == "200"
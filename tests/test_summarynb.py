@@ -2,14 +2,21 @@
 
 """Tests for `summarynb` package."""
 
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
 import pytest
 
 from click.testing import CliRunner
 
 import summarynb
 from summarynb import cli
+from summarynb.config import NotebookConfig, edit_config
+from summarynb.execution import ExecutionResult
 
-# TODO: Test _make_HTML() end-to-end against snapshotted reference html
 # TODO: Test _get_template()
 
 
@@ -57,6 +64,66 @@ def test_chunks_accept_flat_list():
     ]
 
 
+def test_chunks_accept_arrays():
+    import numpy as np
+    import pandas as pd
+
+    files = np.array([f"file{i}" for i in range(5)])
+    expected = [["file0", "file1"], ["file2", "file3"], ["file4"]]
+    assert summarynb.chunks(files, 2) == expected
+    assert summarynb.chunks(pd.Series(files), 2) == expected
+    assert summarynb.chunks(files[:4].reshape(2, 2), (1, 4)) == [
+        ["file0", "file1", "file2", "file3"]
+    ]
+    # lists of arrays are flattened too
+    assert summarynb.chunks([files[:2], [files[2:]]], 2) == expected
+    with pytest.raises(AssertionError):
+        summarynb.chunks(files, (2, 2))
+
+
+def test_chunks_of_other_iterables_are_lists():
+    files = {"a": "file0", "b": "file1", "c": "file2"}
+    rows = summarynb.chunks(files.values(), 2)
+    assert rows == [["file0", "file1"], ["file2"]]
+    assert len(rows) == 2 and list(rows) == rows
+    assert sorted(summarynb.chunks({"file0", "file1"}, 1)) == [["file0"], ["file1"]]
+    assert summarynb.chunks(range(3), (1, 3)) == [[0, 1, 2]]
+
+
+def test_chunks_consume_iterators_lazily():
+    consumed = []
+
+    def files():
+        for i in range(5):
+            consumed.append(i)
+            yield f"file{i}"
+
+    rows = summarynb.chunks(files(), 2)
+    assert consumed == []
+    assert next(rows) == ["file0", "file1"]
+    assert consumed == [0, 1]
+    assert list(rows) == [["file2", "file3"], ["file4"]]
+    with pytest.raises(AssertionError):
+        list(summarynb.chunks(files(), (2, 2)))
+
+
+def test_make_html_accepts_iterators_and_arrays():
+    import numpy as np
+
+    files = ["tests/data/run_1.png", "tests/data/test.txt", "tests/data/run_2.png"]
+
+    def make_html(entries):
+        return summarynb._make_HTML(
+            entries, headers=None, max_width=400, max_height=400
+        )
+
+    expected = make_html(summarynb.chunks(files, 2))
+    assert make_html(summarynb.chunks(iter(files), 2)) == expected
+    assert make_html(summarynb.chunks(np.array(files), 2)) == expected
+    assert make_html(np.array(files[:2]).reshape(1, 2)) == make_html([files[:2]])
+    assert make_html(np.array(files)) == make_html(files)
+
+
 def test_list_of_lists_from_object():
     assert summarynb._ensure_list_of_lists("a") == [["a"]]
 
@@ -77,12 +144,562 @@ def test_command_line_interface():
     assert "--help  Show this message and exit." in help_result.output
 
 
-def test_read_write_metadata_consistency():
+def test_cli_import_is_fast():
+    """The pre-commit hook imports summarynb.cli on every commit, so heavy dependencies must be imported lazily."""
+    script = """
+import json, sys, time
+start = time.perf_counter()
+from summarynb import cli
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}))
+"""
+    # best of a few runs, to ride out a busy machine
+    runs = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", script],
+                stdout=subprocess.PIPE,
+                check=True,
+                universal_newlines=True,
+            ).stdout
+        )
+        for _ in range(3)
+    ]
+    heavy = {"pandas", "numpy", "IPython", "nbformat", "nbclient", "jupyter_client"}
+    assert not heavy & set(runs[0]["modules"])
+    assert min(run["seconds"] for run in runs) < 0.25
+
+
+def test_read_write_metadata_consistency(monkeypatch, tmp_path):
     """Read/write metadata several times. Confirm consistent."""
-    df1 = cli.get_or_create_metadata()
-    cli.write_metadata(df1)
-    df2 = cli.get_or_create_metadata()
-    cli.write_metadata(df2)
-    df3 = cli.get_or_create_metadata()
-    assert df1.equals(df2)
-    assert df2.equals(df3)
+    monkeypatch.setattr(
+        cli, "path_to_config_file", lambda: str(tmp_path / ".summarynb.config")
+    )
+    (tmp_path / "a.ipynb").write_text("{}")
+    (tmp_path / "b.ipynb").write_text("{}")
+    runner = CliRunner()
+    assert runner.invoke(cli.main, ["mark", str(tmp_path / "a.ipynb")]).exit_code == 0
+    result = runner.invoke(
+        cli.main, ["mark", str(tmp_path / "b.ipynb"), "--timeout", "60"]
+    )
+    assert result.exit_code == 0
+    config1 = cli.get_or_create_metadata()
+    config1.save()
+    config2 = cli.get_or_create_metadata()
+    assert config1.notebooks == config2.notebooks
+    assert config2.notebooks == {
+        str(tmp_path / "a.ipynb"): {},
+        str(tmp_path / "b.ipynb"): {"timeout": 60.0},
+    }
+    # already registered
+    assert runner.invoke(cli.main, ["mark", str(tmp_path / "a.ipynb")]).exit_code != 0
+
+    result = runner.invoke(cli.main, ["list"])
+    assert result.output.splitlines()[0].split() == ["filename", "exists", "timeout"]
+    assert runner.invoke(cli.main, ["unmark", str(tmp_path / "a.ipynb")]).exit_code == 0
+    assert cli.get_or_create_metadata().filenames() == [str(tmp_path / "b.ipynb")]
+
+
+def test_metadata_migrated_from_csv(tmp_path):
+    fname = str(tmp_path / ".summarynb.config")
+    with open(fname, "w") as w:
+        w.write("filename,timeout,priority\na.ipynb,,\nb.ipynb,600.0,2.0\na.ipynb,,\n")
+    config = NotebookConfig(fname)
+    assert config.notebooks == {
+        "a.ipynb": {},
+        "b.ipynb": {"timeout": 600.0, "priority": 2},
+    }
+    # higher priority runs first
+    assert config.filenames() == ["b.ipynb", "a.ipynb"]
+
+    with edit_config(fname) as config:
+        config.add("c.ipynb", memory_limit="2G")
+    with open(fname) as f:
+        assert json.load(f)["notebooks"]["c.ipynb"] == {"memory_limit": "2G"}
+    assert NotebookConfig(fname).filenames() == ["b.ipynb", "a.ipynb", "c.ipynb"]
+
+
+def use_autorun_list(monkeypatch, tmp_path, notebooks):
+    # register notebooks: {filename: {setting: value}}
+    fname = str(tmp_path / ".summarynb.config")
+    with edit_config(fname) as config:
+        for notebook, settings in notebooks.items():
+            config.add(notebook, **settings)
+    monkeypatch.setattr(cli, "path_to_config_file", lambda: fname)
+
+
+def isolate_run_records(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        cli, "path_to_run_cache", lambda: str(tmp_path / ".summarynb.cache")
+    )
+    monkeypatch.setattr(
+        cli, "path_to_deps_file", lambda: str(tmp_path / ".summarynb.deps")
+    )
+    monkeypatch.setattr(
+        cli, "path_to_history_file", lambda: str(tmp_path / ".summarynb.history")
+    )
+
+
+def test_run_executes_notebooks_in_parallel_and_aggregates_failures(
+    monkeypatch, tmp_path
+):
+    isolate_run_records(monkeypatch, tmp_path)
+    use_autorun_list(
+        monkeypatch, tmp_path, {"a.ipynb": {}, "b.ipynb": {}, "c.ipynb": {}}
+    )
+    executed = []
+
+    def fake_execute_notebook(fname, kernel_pool, env, **limits):
+        executed.append(fname)
+        cli.print_prefixed(fname, "some output")
+        return ExecutionResult(1 if fname == "b.ipynb" else 0)
+
+    monkeypatch.setattr(cli, "execute_notebook", fake_execute_notebook)
+    result = CliRunner().invoke(
+        cli.main, ["run", "--jobs", "2", "--engine", "nbconvert"]
+    )
+    assert sorted(executed) == ["a.ipynb", "b.ipynb", "c.ipynb"]
+    assert result.exit_code == 1
+    assert "[a.ipynb] some output" in result.output
+    assert "1 of 3 notebooks failed" in result.output
+    assert "  b.ipynb" in result.output
+
+
+def test_run_succeeds_when_all_notebooks_pass(monkeypatch, tmp_path):
+    isolate_run_records(monkeypatch, tmp_path)
+    use_autorun_list(monkeypatch, tmp_path, {"a.ipynb": {}, "b.ipynb": {}})
+    monkeypatch.setattr(
+        cli, "execute_notebook", lambda fname, **kwargs: ExecutionResult(0)
+    )
+    result = CliRunner().invoke(cli.main, ["run", "--engine", "nbconvert"])
+    assert result.exit_code == 0
+    assert "failed" not in result.output
+
+
+def test_run_skips_unchanged_notebooks(monkeypatch, tmp_path):
+    notebook = tmp_path / "summary.ipynb"
+    notebook.write_text(
+        json.dumps({"cells": [{"cell_type": "code", "source": ["show('plot.png')"]}]})
+    )
+    (tmp_path / "plot.png").write_bytes(b"version 1")
+    use_autorun_list(monkeypatch, tmp_path, {str(notebook): {}})
+    isolate_run_records(monkeypatch, tmp_path)
+    executed = []
+    monkeypatch.setattr(
+        cli,
+        "execute_notebook",
+        lambda fname, **kwargs: executed.append(fname) or ExecutionResult(0),
+    )
+
+    runner = CliRunner()
+    runner.invoke(cli.main, ["run", "--engine", "nbconvert"])
+    assert len(executed) == 1
+    result = runner.invoke(cli.main, ["run", "--engine", "nbconvert"])
+    assert len(executed) == 1, "Unchanged notebook should be skipped"
+    assert "skipping" in result.output
+    runner.invoke(cli.main, ["run", "--force", "--engine", "nbconvert"])
+    assert len(executed) == 2, "--force should execute regardless"
+    (tmp_path / "plot.png").write_bytes(b"version 2")
+    runner.invoke(cli.main, ["run", "--engine", "nbconvert"])
+    assert len(executed) == 3, "Changed input file should trigger execution"
+
+
+def test_run_records_files_read_by_loaders(monkeypatch, tmp_path):
+    notebook = tmp_path / "summary.ipynb"
+    # the file name is built at runtime, so it can't be detected from the code
+    notebook.write_text(
+        json.dumps(
+            {"cells": [{"cell_type": "code", "source": ["show(f'data{1}.csv')"]}]}
+        )
+    )
+    (tmp_path / "data1.csv").write_text("x\n1\n")
+    use_autorun_list(monkeypatch, tmp_path, {str(notebook): {}})
+    isolate_run_records(monkeypatch, tmp_path)
+    executed = []
+
+    def fake_execute_notebook(fname, kernel_pool, env, **limits):
+        executed.append(fname)
+        monkeypatch.setenv(
+            summarynb.deps.DEPS_FILE_ENV, env[summarynb.deps.DEPS_FILE_ENV]
+        )
+        summarynb.csv(str(tmp_path / "data1.csv"))
+        summarynb.image(str(tmp_path / "missing.png"))
+        monkeypatch.delenv(summarynb.deps.DEPS_FILE_ENV)
+        return ExecutionResult(0)
+
+    monkeypatch.setattr(cli, "execute_notebook", fake_execute_notebook)
+    runner = CliRunner()
+    runner.invoke(cli.main, ["run", "--engine", "nbconvert"])
+    runner.invoke(cli.main, ["run", "--engine", "nbconvert"])
+    assert len(executed) == 1, "Unchanged notebook should be skipped"
+
+    result = runner.invoke(cli.main, ["deps"])
+    assert result.exit_code == 0
+    assert "data1.csv" in result.output
+    assert "missing.png" not in result.output
+    result = runner.invoke(
+        cli.main, ["deps", "--dependents", str(tmp_path / "data1.csv")]
+    )
+    assert "summary.ipynb" in result.output
+
+    (tmp_path / "data1.csv").write_text("x\n2\n")
+    assert "data1.csv (changed)" in runner.invoke(cli.main, ["deps"]).output
+    runner.invoke(cli.main, ["run", "--engine", "nbconvert"])
+    assert len(executed) == 2, "Changed recorded input should trigger execution"
+
+
+def test_run_applies_limits_and_reports_timings(monkeypatch, tmp_path):
+    isolate_run_records(monkeypatch, tmp_path)
+    use_autorun_list(
+        monkeypatch,
+        tmp_path,
+        {"fast.ipynb": {"memory_limit": "1G"}, "slow.ipynb": {"timeout": 5}},
+    )
+    limits = {}
+
+    def fake_execute_notebook(fname, kernel_pool, env, timeout, memory_limit):
+        limits[fname] = (timeout, memory_limit)
+        if fname == "slow.ipynb":
+            return ExecutionResult(1, peak_rss=2 * 1024**3, timed_out=True)
+        return ExecutionResult(0, peak_rss=1024**2)
+
+    monkeypatch.setattr(cli, "execute_notebook", fake_execute_notebook)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        ["run", "--engine", "nbconvert", "--timeout", "60", "--memory-limit", "2G"],
+    )
+    assert result.exit_code == 1
+    # per-notebook settings override the command line defaults
+    assert limits == {
+        "fast.ipynb": (60.0, 1024**3),
+        "slow.ipynb": (5.0, 2 * 1024**3),
+    }
+    assert "Slowest notebooks first" in result.output
+    assert "timed out" in result.output
+    assert "1.0 MB" in result.output
+
+    result = runner.invoke(cli.main, ["history"])
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert lines[0].split()[:3] == ["notebook", "runs", "failed"]
+    assert lines[1].split()[:3] == ["fast.ipynb", "1", "0"]
+    assert lines[2].split()[:3] == ["slow.ipynb", "1", "1"]
+
+    result = runner.invoke(cli.main, ["run", "--memory-limit", "lots"])
+    assert result.exit_code == 2
+
+
+def test_watch_applies_limits(monkeypatch, tmp_path):
+    from summarynb import watch
+
+    isolate_run_records(monkeypatch, tmp_path)
+    use_autorun_list(monkeypatch, tmp_path, {"slow.ipynb": {"timeout": 5}})
+    limits = []
+
+    def fake_execute_notebook(fname, kernel_pool, env, timeout, memory_limit):
+        limits.append((fname, timeout, memory_limit))
+        return ExecutionResult(1)
+
+    def fake_watch(list_notebooks, run, **kwargs):
+        run(list_notebooks())
+        # settings changed while watching apply to the next run
+        with edit_config(cli.path_to_config_file()) as config:
+            config.add("slow.ipynb", timeout=10)
+        run(list_notebooks())
+
+    monkeypatch.setattr(cli, "execute_notebook", fake_execute_notebook)
+    monkeypatch.setattr(watch, "watch", fake_watch)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        ["watch", "--engine", "nbconvert", "--timeout", "60", "--memory-limit", "2G"],
+    )
+    assert result.exit_code == 0, result.output
+    assert limits == [
+        ("slow.ipynb", 5.0, 2 * 1024**3),
+        ("slow.ipynb", 10.0, 2 * 1024**3),
+    ]
+
+    result = runner.invoke(cli.main, ["watch", "--memory-limit", "lots"])
+    assert result.exit_code == 2
+
+
+def test_run_staged_only_executes_affected_notebooks(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init", "-q"], check=True)
+    for name in ["a", "b"]:
+        (tmp_path / f"{name}.csv").write_text("x\n1\n")
+        (tmp_path / f"{name}.ipynb").write_text(
+            json.dumps(
+                {"cells": [{"cell_type": "code", "source": [f"show('{name}.csv')"]}]}
+            )
+        )
+    (tmp_path / "README.md").write_text("hello")
+    use_autorun_list(monkeypatch, tmp_path, {"a.ipynb": {}, "b.ipynb": {}})
+    isolate_run_records(monkeypatch, tmp_path)
+    executed = []
+    monkeypatch.setattr(
+        cli,
+        "execute_notebook",
+        lambda fname, **kwargs: executed.append(fname) or ExecutionResult(0),
+    )
+    runner = CliRunner()
+
+    def run_staged(*paths):
+        subprocess.run(["git", "add"] + list(paths), check=True)
+        del executed[:]
+        result = runner.invoke(cli.main, ["run", "--staged", "--force"])
+        assert result.exit_code == 0, result.output
+        subprocess.run(["git", "reset", "-q"], check=True)
+        return sorted(executed)
+
+    assert run_staged("README.md") == []
+    assert run_staged("README.md", "b.csv") == ["b.ipynb"]
+    assert run_staged("a.ipynb") == ["a.ipynb"]
+    # a changed autorun list affects every notebook
+    assert run_staged(".summarynb.config") == ["a.ipynb", "b.ipynb"]
+
+    with edit_config(cli.path_to_config_file()) as config:
+        config.options["run_all_on_commit"] = True
+    assert run_staged("README.md") == ["a.ipynb", "b.ipynb"]
+
+
+def test_make_html_with_workers_matches_serial():
+    entries = summarynb.chunks(
+        [
+            ["tests/data/run_%d.png" % (i + 1), "tests/data/run_%d.csv" % (i + 1)]
+            for i in range(16)
+        ]
+        + ["tests/data/test.txt"],
+        shape=4,
+    )
+    serial = summarynb._make_HTML(entries, headers=None, max_width=400, max_height=400)
+    assert (
+        summarynb._make_HTML(
+            entries, headers=None, max_width=400, max_height=400, workers=8
+        )
+        == serial
+    )
+
+
+def test_make_html_with_workers_shows_errors_inline():
+    entries = [["tests/data/test.txt", "tests/data/missing.csv"]]
+    with pytest.raises(FileNotFoundError):
+        summarynb._make_HTML(entries, headers=None, max_width=400, max_height=400)
+    html = summarynb._make_HTML(
+        entries, headers=None, max_width=400, max_height=400, workers=2
+    )
+    assert "Test from file" in html
+    assert "tests/data/missing.csv: FileNotFoundError" in html
+
+
+def cell(label):
+    def template(*args, **kwargs):
+        return label
+
+    return template
+
+
+def test_make_html_paginated():
+    entries = summarynb.chunks([cell(f"cell{i}") for i in range(10)], 2)
+    html = summarynb._make_HTML(
+        entries, headers=["a", "b"], max_width=None, max_height=None, page_size=2
+    )
+    # first page is live, and every page is pre-rendered into a template
+    live_page = html.split('<tbody class="summarynb-page">')[1].split("</tbody>")[0]
+    assert "cell3" in live_page and "cell4" not in live_page
+    assert html.count('<template class="summarynb-page">') == 3
+    assert "Page 1 of 3" in html
+    assert "<thead><tr>" in html
+
+
+def test_make_html_single_page():
+    entries = summarynb.chunks([cell(f"cell{i}") for i in range(10)], 2)
+    html = summarynb._make_HTML(
+        entries, headers=None, max_width=None, max_height=None, page_size=2, page=3
+    )
+    assert "cell8" in html and "cell9" in html
+    assert "cell7" not in html and "cell0" not in html
+    assert "Page 3 of 3 (rows 5-5 of 5)" in html
+    with pytest.raises(ValueError):
+        summarynb._make_HTML(
+            entries, headers=None, max_width=None, max_height=None, page_size=2, page=4
+        )
+    # without page_size, page would otherwise be ignored and every row rendered
+    with pytest.raises(ValueError, match="page requires page_size"):
+        summarynb._make_HTML(
+            entries, headers=None, max_width=None, max_height=None, page=2
+        )
+    for page_size in [0, -1]:
+        with pytest.raises(ValueError, match="page_size must be at least 1"):
+            summarynb._make_HTML(
+                entries,
+                headers=None,
+                max_width=None,
+                max_height=None,
+                page_size=page_size,
+            )
+
+
+def failing_template(*args, **kwargs):
+    raise RuntimeError("could not render")
+
+
+def files_grid():
+    return [
+        ["tests/data/run_1.png", "tests/data/test.txt"],
+        ["tests/data/run_2.png", summarynb.empty(200)],
+    ]
+
+
+def labeled_cells(n_cells):
+    return [summarynb.plaintext(f"cell <{i}>") for i in range(n_cells)]
+
+
+def first_progress_update(entries, **kwargs):
+    updates = []
+    summarynb._make_HTML(entries, on_progress=updates.append, **kwargs)
+    return updates[0]
+
+
+# Reference HTML for _make_HTML(), stored in tests/data/snapshots.
+# After an intended change to the markup, regenerate with SUMMARYNB_UPDATE_SNAPSHOTS=1 and review the diff.
+html_snapshots = {
+    "grid_with_headers": lambda: summarynb._make_HTML(
+        files_grid(), headers=[" Plot ", "Details"], max_width=400, max_height=300
+    ),
+    "single_entry": lambda: summarynb._make_HTML(
+        "tests/data/test.txt", headers=None, max_width=400, max_height=300
+    ),
+    "single_row": lambda: summarynb._make_HTML(
+        labeled_cells(3), headers=["a", "b", "c"], max_width=None, max_height=None
+    ),
+    "ragged_rows": lambda: summarynb._make_HTML(
+        summarynb.chunks(labeled_cells(5), 2),
+        headers=None,
+        max_width=None,
+        max_height=None,
+    ),
+    "paginated": lambda: summarynb._make_HTML(
+        summarynb.chunks(labeled_cells(9), 2),
+        headers=["a", "b"],
+        max_width=None,
+        max_height=None,
+        page_size=2,
+    ),
+    "paginated_page": lambda: summarynb._make_HTML(
+        summarynb.chunks(labeled_cells(9), 2),
+        headers=["a", "b"],
+        max_width=None,
+        max_height=None,
+        page_size=2,
+        page=3,
+    ),
+    "inline_errors": lambda: summarynb._make_HTML(
+        [[failing_template, "tests/data/missing.csv"], labeled_cells(1)],
+        headers=None,
+        max_width=None,
+        max_height=None,
+        workers=2,
+    ),
+    "progress_placeholders": lambda: first_progress_update(
+        files_grid(),
+        headers=None,
+        max_width=400,
+        max_height=300,
+        page_size=1,
+    ),
+}
+
+
+@pytest.mark.parametrize("name", list(html_snapshots))
+def test_make_html_snapshots(name, monkeypatch):
+    monkeypatch.setattr(summarynb, "_paginated_grid_ids", itertools.count())
+    html = html_snapshots[name]()
+    fname = os.path.join("tests", "data", "snapshots", f"{name}.html")
+    if os.environ.get("SUMMARYNB_UPDATE_SNAPSHOTS"):
+        os.makedirs(os.path.dirname(fname), exist_ok=True)
+        with open(fname, "w", newline="") as w:
+            w.write(html)
+    with open(fname, "r", newline="") as f:
+        assert html == f.read()
+
+
+def test_make_html_progressive():
+    entries = [
+        ["tests/data/test.txt", "tests/data/missing.csv"],
+        ["tests/data/run_1.png"],
+    ]
+    updates = []
+    html = summarynb._make_HTML(
+        entries,
+        headers=None,
+        max_width=400,
+        max_height=400,
+        on_progress=updates.append,
+        progress_interval=0,
+    )
+    # skeleton first, then one update per cell
+    assert len(updates) == 4
+    assert updates[0].count("Loading") == 3
+    assert "Loading tests/data/test.txt" not in updates[1]
+    assert updates[-1] == html
+    assert "Test from file" in html
+    assert "FileNotFoundError" in html
+
+
+def test_show_progressive(capsys):
+    summarynb.show(["tests/data/run_1.png", "tests/data/test.txt"], progressive=True)
+    # outside IPython, display() prints a placeholder for the skeleton and for each update
+    assert capsys.readouterr().out.count("HTML object") >= 2
+
+
+def test_make_html_async_matches_serial():
+    entries = [
+        ["tests/data/run_1.png", "tests/data/test.txt"],
+        ["tests/data/run_1.csv"],
+    ]
+    expected = summarynb._make_HTML(
+        entries, headers=["a", "b"], max_width=400, max_height=400
+    )
+    html = asyncio.run(
+        summarynb.make_html_async(
+            entries, headers=["a", "b"], max_width=400, max_height=400
+        )
+    )
+    assert html == expected
+
+
+def test_make_html_async_awaits_loaders():
+    async def main():
+        return await summarynb.make_html_async(
+            [summarynb.csv_async("tests/data/run_1.csv"), "tests/data/run_1.png"]
+        )
+
+    html = asyncio.run(main())
+    assert html == summarynb._make_HTML(
+        [[summarynb.csv("tests/data/run_1.csv"), "tests/data/run_1.png"]],
+        headers=None,
+        max_width=800,
+        max_height=800,
+    )
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(summarynb.make_html_async(["tests/data/missing.csv"]))
+
+
+def test_make_html_async_paginates(monkeypatch):
+    entries = summarynb.chunks(labeled_cells(9), 2)
+    for page in [None, 2]:
+        options = dict(
+            headers=["a", "b"], max_width=None, max_height=None, page_size=2, page=page
+        )
+        monkeypatch.setattr(summarynb, "_paginated_grid_ids", itertools.count())
+        expected = summarynb._make_HTML(entries, **options)
+        monkeypatch.setattr(summarynb, "_paginated_grid_ids", itertools.count())
+        assert asyncio.run(summarynb.make_html_async(entries, **options)) == expected
+
+    with pytest.raises(ValueError, match="page requires page_size"):
+        asyncio.run(summarynb.make_html_async(entries, page=2))
+    # scheduling options of show() are rejected by name
+    with pytest.raises(TypeError, match="workers"):
+        asyncio.run(summarynb.make_html_async(entries, workers=4))
@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+import pytest
+
+from summarynb import watch
+
+
+def write_notebook(fname, source):
+    with open(fname, "w") as w:
+        json.dump(
+            {
+                "cells": [{"cell_type": "code", "source": source}],
+                "metadata": {},
+                "nbformat": 4,
+                "nbformat_minor": 4,
+            },
+            w,
+        )
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def test_dependency_graph(tmp_path):
+    (tmp_path / "a.csv").write_text("x\n1\n")
+    write_notebook(tmp_path / "one.ipynb", 'show("a.csv")')
+    write_notebook(tmp_path / "two.ipynb", 'show(["a.csv", "missing.png"])')
+    notebooks = [str(tmp_path / "one.ipynb"), str(tmp_path / "two.ipynb")]
+    graph = watch.dependency_graph(notebooks + [str(tmp_path / "gone.ipynb")])
+    assert graph[str(tmp_path / "a.csv")] == notebooks
+    assert graph[str(tmp_path / "one.ipynb")] == notebooks[:1]
+    assert graph[str(tmp_path / "gone.ipynb")] == [str(tmp_path / "gone.ipynb")]
+
+
+def test_change_queue_debounces():
+    changes = watch.ChangeQueue()
+    changes.add("a")
+    start = time.monotonic()
+    threading.Timer(0.1, changes.add, ["b"]).start()
+    assert changes.wait(debounce=0.3) == {"a", "b"}
+    # waited for the second change to settle
+    assert time.monotonic() - start >= 0.35
+
+    stop = threading.Event()
+    stop.set()
+    assert changes.wait(debounce=0.3, stop=stop) == set()
+
+
+@pytest.mark.parametrize("polling", [True, False])
+def test_watch_reruns_affected_notebooks(tmp_path, polling):
+    if not polling:
+        pytest.importorskip("watchdog")
+    (tmp_path / "a.csv").write_text("x\n1\n")
+    (tmp_path / "b.csv").write_text("x\n1\n")
+    write_notebook(tmp_path / "one.ipynb", 'show("a.csv")')
+    write_notebook(tmp_path / "two.ipynb", 'show("b.csv")')
+    notebooks = [str(tmp_path / "one.ipynb"), str(tmp_path / "two.ipynb")]
+
+    runs = []
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=watch.watch,
+        args=(lambda: notebooks, runs.append),
+        kwargs=dict(debounce=0.2, polling=polling, poll_interval=0.05, stop=stop),
+    )
+    thread.start()
+    try:
+        # brought up to date first
+        wait_until(lambda: len(runs) == 1)
+        assert runs[0] == notebooks
+
+        # a burst of writes to one input re-runs only the notebook that reads it, once
+        time.sleep(0.2)
+        for i in range(3):
+            (tmp_path / "b.csv").write_text(f"x\n{i + 2}\n")
+            time.sleep(0.05)
+        wait_until(lambda: len(runs) == 2)
+        assert runs[1] == notebooks[1:]
+        time.sleep(0.5)
+        assert len(runs) == 2
+    finally:
+        stop.set()
+        thread.join()